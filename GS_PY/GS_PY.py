@@ -8,11 +8,16 @@ João Santis       RM555287
 '''
 
 # Importações
+# oracledb, numpy, pandas e matplotlib são importados dentro das funções que os utilizam,
+# para que importar este módulo (jobs em lote, testes) seja instantâneo e funcione offline.
 import os 
 import re
-import oracledb
-import pandas as pd
-import matplotlib.pyplot as plt
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing, contextmanager, redirect_stdout
+from functools import lru_cache
 
 # =========================================================================================
 # Objetivo do projeto
@@ -29,22 +34,621 @@ otimizando custos e ampliando os impactos positivos no meio ambiente e na econom
 """
 
 # =========================================================================================
-# Conexão com o Banco de Dados Oracle
+# Conexão com o Banco de Dados (Oracle ou SQLite local)
 # =========================================================================================
-try:
-    conn = oracledb.connect(user="RM555352", password="260606", dsn="oracle.fiap.com.br:1521/ORCL")
-    cursor = conn.cursor()
-    conexao = True
-except Exception as e:
-    conexao = False
-    print(f"Erro de conexão: {e}")
+DB_CONFIG = {'user': "RM555352", 'password': "260606", 'dsn': "oracle.fiap.com.br:1521/ORCL"}
+
+def criar_pool(min_sessoes=1, max_sessoes=4, incremento=1, ping_interval=60, tamanho_cache_sql=40):
+    """
+    Cria o pool de conexões com o Oracle compartilhado por todas as funções do sistema.
+
+    Parâmetros:
+    min_sessoes (int): Quantidade mínima de sessões mantidas abertas.
+    max_sessoes (int): Quantidade máxima de sessões simultâneas.
+    incremento (int): Sessões abertas de cada vez quando o pool precisa crescer.
+    ping_interval (int): Segundos de ociosidade após os quais a sessão é testada (ping)
+    antes de ser entregue, descartando conexões caídas.
+    tamanho_cache_sql (int): Statements mantidos já analisados (parse) em cada sessão.
+    """
+    import oracledb
+
+    return oracledb.create_pool(
+        **DB_CONFIG,
+        min=min_sessoes,
+        max=max_sessoes,
+        increment=incremento,
+        ping_interval=ping_interval,
+        getmode=oracledb.POOL_GETMODE_WAIT,
+        stmtcachesize=tamanho_cache_sql,
+    )
+
+def criar_pool_async(min_sessoes=1, max_sessoes=4, incremento=1, ping_interval=60, tamanho_cache_sql=40):
+    """
+    Cria o pool de conexões assíncrono (asyncio) com o Oracle, usado pelas funções '*_async'.
+    Os parâmetros são os mesmos de 'criar_pool'.
+    """
+    import oracledb
+
+    return oracledb.create_pool_async(
+        **DB_CONFIG,
+        min=min_sessoes,
+        max=max_sessoes,
+        increment=incremento,
+        ping_interval=ping_interval,
+        getmode=oracledb.POOL_GETMODE_WAIT,
+        stmtcachesize=tamanho_cache_sql,
+    )
+
+class BackendOracle:
+    """
+    Armazenamento no Oracle, através de um pool de sessões criado no primeiro uso.
+    """
+    nome = 'oracle'
+
+    def __init__(self, **opcoes_pool):
+        self.opcoes_pool = opcoes_pool
+        self.pool = None
+        self.pool_async = None
+        self.loop_async = None
+        self.esquema_criado = False
+
+    @property
+    def IntegrityError(self):
+        import oracledb
+        return oracledb.IntegrityError
+
+    def obter_pool(self):
+        if self.pool is None:
+            self.pool = criar_pool(**self.opcoes_pool)
+        return self.pool
+
+    def criar_tabelas(self):
+        # Aplica as migrações pendentes antes da primeira leitura ou gravação do processo
+        with self.obter_pool().acquire() as conn:
+            migrar_esquema(conn, self.nome)
+        self.esquema_criado = True
+
+    @contextmanager
+    def conectar(self):
+        if not self.esquema_criado:
+            self.criar_tabelas()
+        # Ao sair do bloco a sessão volta ao pool (transações não confirmadas são desfeitas)
+        with self.obter_pool().acquire() as conn:
+            yield conn
+
+    def ping(self, conn):
+        conn.ping()
+
+    def obter_pool_async(self):
+        import asyncio
+
+        # O pool assíncrono fica ligado ao event loop em que foi criado (deve ser chamado dentro dele)
+        loop = asyncio.get_running_loop()
+        if self.pool_async is not None and self.loop_async is not loop:
+            # Só o loop original consegue fechar as sessões do pool: trocar de pool aqui as deixaria abertas
+            raise RuntimeError(
+                "O pool assíncrono pertence a outro event loop: chame 'fechar_conexoes_async()' "
+                "antes de encerrar o loop anterior."
+            )
+        if self.pool_async is None:
+            if not self.esquema_criado:
+                self.criar_tabelas()
+            self.pool_async = criar_pool_async(**self.opcoes_pool)
+            self.loop_async = loop
+        return self.pool_async
+
+    async def consultar_async(self, query, params):
+        """
+        Executa um SELECT no pool assíncrono e retorna (nomes das colunas, linhas).
+        """
+        async with self.obter_pool_async().acquire() as conn:
+            with conn.cursor() as cursor:
+                await cursor.execute(query, params)
+                linhas = await cursor.fetchall()
+                return [descricao[0] for descricao in cursor.description], linhas
+
+    async def executar_async(self, query, params):
+        """
+        Executa um INSERT/UPDATE no pool assíncrono, com commit, e retorna as linhas afetadas.
+        """
+        async with self.obter_pool_async().acquire() as conn:
+            with conn.cursor() as cursor:
+                await cursor.execute(query, params)
+                await conn.commit()
+                return cursor.rowcount
+
+    async def fechar_async(self):
+        if self.pool_async is not None:
+            await self.pool_async.close()
+            self.pool_async = None
+            self.loop_async = None
+
+    def executar_retornando(self, cursor, query, params, colunas):
+        """
+        Executa um UPDATE/INSERT com RETURNING ... INTO e retorna os valores da primeira linha
+        afetada (ou None se nenhuma linha foi afetada).
+        """
+        variaveis = {f"ret_{coluna}": cursor.var(float) for coluna in colunas}
+        query += f" RETURNING {', '.join(colunas)} INTO {', '.join(':' + nome for nome in variaveis)}"
+        cursor.execute(query, {**params, **variaveis})
+        if cursor.rowcount == 0:
+            return None
+        return tuple(variavel.getvalue()[0] for variavel in variaveis.values())
+
+    def ajustar_cursor(self, cursor, linhas):
+        # Busca as linhas esperadas já na resposta do execute (+1 para detectar o fim sem outra ida ao banco)
+        cursor.arraysize = linhas
+        cursor.prefetchrows = linhas + 1
+
+    def plano_execucao(self, cursor, query, params):
+        # EXPLAIN PLAN não recebe valores das binds: o plano vale para qualquer valor
+        cursor.execute("EXPLAIN PLAN FOR " + query)
+        cursor.execute("SELECT plan_table_output FROM TABLE(DBMS_XPLAN.DISPLAY())")
+        return '\n'.join(linha[0] for linha in cursor.fetchall())
+
+    def buscar_colunas(self, conn, query, params, tamanho_bloco):
+        """
+        Busca o resultado direto em colunas Arrow (fetch_df_all), sem criar tuplas por linha.
+        Retorna {coluna em minúsculas: pyarrow.ChunkedArray}.
+        """
+        import pyarrow as pa
+
+        tabela = pa.table(conn.fetch_df_all(query, params, arraysize=tamanho_bloco))
+        return {nome.lower(): tabela.column(nome) for nome in tabela.column_names}
+
+    def executar_em_lote(self, cursor, query, linhas):
+        """
+        executemany com batcherrors: retorna [(posição da linha, mensagem)] das linhas rejeitadas.
+        """
+        cursor.executemany(query, linhas, batcherrors=True)
+        return [(erro.offset, erro.message) for erro in cursor.getbatcherrors()]
+
+    def executar_em_lote_contando(self, cursor, query, linhas):
+        """
+        executemany (uma ida ao banco) retornando quantas linhas cada registro de 'linhas' afetou.
+        """
+        cursor.executemany(query, linhas, arraydmlrowcounts=True)
+        return cursor.getarraydmlrowcounts()
+
+    def fechar(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+class BackendSQLite:
+    """
+    Armazenamento em um banco SQLite embarcado, com o mesmo esquema das tabelas do Oracle.
+    Usado em testes de carga, benchmarks locais e em fazendas sem acesso à rede.
+    """
+    nome = 'sqlite'
+
+    def __init__(self, caminho='gs_py.db'):
+        # ':memory:' vira um banco em memória compartilhado entre as conexões do processo
+        if caminho == ':memory:':
+            self.caminho = f"file:gs_py_memoria_{id(self)}?mode=memory&cache=shared"
+        else:
+            self.caminho = caminho
+        self.ancora = None
+        self.esquema_criado = False
+
+    @property
+    def IntegrityError(self):
+        import sqlite3
+        return sqlite3.IntegrityError
+
+    def abrir(self):
+        import sqlite3
+
+        conn = sqlite3.connect(self.caminho, uri=self.caminho.startswith('file:'), check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def criar_tabelas(self):
+        # Mantém uma conexão aberta para que bancos em memória não sejam descartados
+        if self.ancora is None:
+            self.ancora = self.abrir()
+        migrar_esquema(self.ancora, self.nome)
+        self.esquema_criado = True
+
+    @contextmanager
+    def conectar(self):
+        if not self.esquema_criado:
+            self.criar_tabelas()
+        conn = self.abrir()
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+            conn.close()
+
+    def ping(self, conn):
+        conn.execute("SELECT 1")
+
+    # O sqlite3 não tem API assíncrona: as funções '*_async' rodam a chamada em uma thread
+    def consultar(self, query, params):
+        with self.conectar() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute(query, params)
+            return [descricao[0] for descricao in cursor.description], cursor.fetchall()
+
+    def executar(self, query, params):
+        with self.conectar() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute(query, params)
+            conn.commit()
+            return cursor.rowcount
+
+    async def consultar_async(self, query, params):
+        import asyncio
+        return await asyncio.to_thread(self.consultar, query, params)
+
+    async def executar_async(self, query, params):
+        import asyncio
+        return await asyncio.to_thread(self.executar, query, params)
+
+    async def fechar_async(self):
+        pass
+
+    def executar_retornando(self, cursor, query, params, colunas):
+        cursor.execute(query + f" RETURNING {', '.join(colunas)}", params)
+        linhas = cursor.fetchall()
+        return tuple(linhas[0]) if linhas else None
+
+    def ajustar_cursor(self, cursor, linhas):
+        cursor.arraysize = linhas
+
+    def plano_execucao(self, cursor, query, params):
+        cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+        return '\n'.join(linha[-1] for linha in cursor.fetchall())
+
+    def buscar_colunas(self, conn, query, params, tamanho_bloco):
+        """
+        Busca o resultado em blocos (fetchmany), convertendo cada bloco em arrays NumPy tipados
+        por coluna. Retorna {coluna em minúsculas: np.ndarray}.
+        """
+        import numpy as np
+
+        with closing(conn.cursor()) as cursor:
+            cursor.arraysize = tamanho_bloco
+            cursor.execute(query, params)
+            nomes = [descricao[0].lower() for descricao in cursor.description]
+            tipos = [SimulacoesCompactas.tipos.get(nome, object) for nome in nomes]
+            blocos = {nome: [np.array([], dtype=tipo)] for nome, tipo in zip(nomes, tipos)}
+            while True:
+                linhas = cursor.fetchmany(tamanho_bloco)
+                if not linhas:
+                    break
+                for nome, tipo, valores in zip(nomes, tipos, zip(*linhas)):
+                    blocos[nome].append(np.array(valores, dtype=tipo))
+
+        return {nome: np.concatenate(partes) for nome, partes in blocos.items()}
+
+    def executar_em_lote(self, cursor, query, linhas):
+        """
+        Equivalente ao batcherrors do Oracle: tenta o lote inteiro e, se alguma linha falhar,
+        refaz o lote linha a linha para identificar as rejeitadas.
+        """
+        import sqlite3
+
+        cursor.execute("SAVEPOINT lote")
+        try:
+            cursor.executemany(query, linhas)
+            cursor.execute("RELEASE SAVEPOINT lote")
+            return []
+        except sqlite3.Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT lote")
+
+        erros = []
+        for posicao, linha in enumerate(linhas):
+            try:
+                cursor.execute(query, linha)
+            except sqlite3.Error as e:
+                erros.append((posicao, str(e)))
+        cursor.execute("RELEASE SAVEPOINT lote")
+        return erros
+
+    def executar_em_lote_contando(self, cursor, query, linhas):
+        """
+        Equivalente ao arraydmlrowcounts do Oracle (no SQLite não há ida ao banco por linha).
+        """
+        contagens = []
+        for linha in linhas:
+            cursor.execute(query, linha)
+            contagens.append(cursor.rowcount)
+        return contagens
+
+    def fechar(self):
+        if self.ancora is not None:
+            self.ancora.close()
+            self.ancora = None
+            self.esquema_criado = False
+
+def configurar_backend(nome='oracle', **opcoes):
+    """
+    Define onde as simulações e usuários são armazenados.
+
+    Parâmetros:
+    nome (str): 'oracle' (padrão, usa DB_CONFIG) ou 'sqlite'.
+    opcoes: Repassadas ao backend (ex.: caminho='gs_py.db' no SQLite, max_sessoes=8 no Oracle).
+    """
+    global backend
+    backends = {'oracle': BackendOracle, 'sqlite': BackendSQLite}
+    if nome not in backends:
+        raise ValueError(f"Backend desconhecido: {nome} (use {' ou '.join(backends)})")
+
+    if backend is not None:
+        backend.fechar()
+    backend = backends[nome](**opcoes)
+    return backend
+
+def obter_backend():
+    """
+    Retorna o backend em uso. Sem configuração explícita, usa a variável de ambiente
+    GS_PY_BACKEND ('oracle' ou 'sqlite'; GS_PY_SQLITE define o arquivo do SQLite).
+    """
+    if backend is None:
+        nome = os.environ.get('GS_PY_BACKEND', 'oracle')
+        opcoes = {'caminho': os.environ['GS_PY_SQLITE']} if nome == 'sqlite' and 'GS_PY_SQLITE' in os.environ else {}
+        configurar_backend(nome, **opcoes)
+    return backend
+
+def obter_conexao():
+    """
+    Obtém uma conexão do backend em uso. Use com 'with': ao sair do bloco a conexão é
+    devolvida (transações não confirmadas são desfeitas).
+    """
+    return obter_backend().conectar()
+
+def fechar_conexoes():
+    """
+    Fecha as conexões do backend em uso, se ele tiver sido criado.
+    """
+    if backend is not None:
+        backend.fechar()
+
+def verificar_conexao():
+    """
+    Verificação de saúde do banco: obtém uma conexão e executa um ping.
+    """
+    try:
+        with obter_conexao() as conn:
+            obter_backend().ping(conn)
+        return True
+    except Exception as e:
+        print(f"Erro de conexão: {e}")
+        return False
+
+# O backend (e o pool do Oracle) só é criado na primeira operação que precisa do banco
+backend = None
+
+
+# =========================================================================================
+# Esquema do Banco e Migrações
+# =========================================================================================
+# Cada migração tem uma versão, uma descrição e os comandos DDL de cada backend.
+# Novas alterações de esquema devem ser adicionadas ao final, com a próxima versão.
+migracoes = [
+    (1, "Tabelas usuarios e simulacoes", {
+        'oracle': [
+            """
+            CREATE TABLE usuarios (
+                usuario_id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+                nome VARCHAR2(100) NOT NULL,
+                email VARCHAR2(255) NOT NULL,
+                senha VARCHAR2(255) NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE simulacoes (
+                simulacao_id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+                nome VARCHAR2(100) NOT NULL,
+                tamanho_disp NUMBER NOT NULL,
+                estado CHAR(2) NOT NULL,
+                consumo NUMBER NOT NULL,
+                orcamento NUMBER NOT NULL,
+                custo_investimento NUMBER,
+                economia_anual NUMBER,
+                data DATE DEFAULT SYSDATE,
+                usuario_id NUMBER NOT NULL REFERENCES usuarios (usuario_id),
+                ativo CHAR(1) DEFAULT 'T' NOT NULL CHECK (ativo IN ('T', 'F'))
+            )
+            """,
+        ],
+        # No SQLite as colunas são declaradas em maiúsculas para que cursor.description
+        # devolva os mesmos nomes que o Oracle
+        'sqlite': [
+            """
+            CREATE TABLE IF NOT EXISTS usuarios (
+                USUARIO_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                NOME TEXT NOT NULL,
+                EMAIL TEXT NOT NULL,
+                SENHA TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS simulacoes (
+                SIMULACAO_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                NOME TEXT NOT NULL,
+                TAMANHO_DISP REAL NOT NULL,
+                ESTADO CHAR(2) NOT NULL,
+                CONSUMO REAL NOT NULL,
+                ORCAMENTO REAL NOT NULL,
+                CUSTO_INVESTIMENTO REAL,
+                ECONOMIA_ANUAL REAL,
+                DATA TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                USUARIO_ID INTEGER NOT NULL REFERENCES usuarios (USUARIO_ID),
+                ATIVO CHAR(1) DEFAULT 'T' NOT NULL CHECK (ATIVO IN ('T', 'F'))
+            )
+            """,
+        ],
+    }),
+    (2, "Índices dos caminhos de acesso por usuário e do login", {
+        'oracle': [
+            # simulacao_id no fim do índice atende também a ordenação/paginação por ID
+            "CREATE INDEX ix_simulacoes_usuario_ativo ON simulacoes (usuario_id, ativo, simulacao_id)",
+            "CREATE INDEX ix_simulacoes_usuario_tamanho ON simulacoes (usuario_id, ativo, tamanho_disp)",
+            "CREATE INDEX ix_simulacoes_usuario_consumo ON simulacoes (usuario_id, ativo, consumo)",
+            "CREATE INDEX ix_simulacoes_usuario_orcamento ON simulacoes (usuario_id, ativo, orcamento)",
+            "CREATE UNIQUE INDEX ux_usuarios_email ON usuarios (email)",
+        ],
+        'sqlite': [
+            "CREATE INDEX IF NOT EXISTS ix_simulacoes_usuario_ativo ON simulacoes (usuario_id, ativo, simulacao_id)",
+            "CREATE INDEX IF NOT EXISTS ix_simulacoes_usuario_tamanho ON simulacoes (usuario_id, ativo, tamanho_disp)",
+            "CREATE INDEX IF NOT EXISTS ix_simulacoes_usuario_consumo ON simulacoes (usuario_id, ativo, consumo)",
+            "CREATE INDEX IF NOT EXISTS ix_simulacoes_usuario_orcamento ON simulacoes (usuario_id, ativo, orcamento)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_usuarios_email ON usuarios (email)",
+        ],
+    }),
+    # A economia anual era gravada multiplicada por 5, o que deixava o tempo para lucro e o
+    # Monte Carlo cinco vezes mais otimistas que a projeção de fluxo de caixa. Só as linhas
+    # gravadas até a aplicação desta migração (aplicada_em da versão 3) são corrigidas.
+    (3, "Economia anual sem o multiplicador histórico (x5)", {
+        'oracle': [
+            """
+            UPDATE simulacoes SET economia_anual = economia_anual / 5
+            WHERE data <= (SELECT aplicada_em FROM versao_esquema WHERE versao = 3)
+            """,
+        ],
+        'sqlite': [
+            """
+            UPDATE simulacoes SET economia_anual = economia_anual / 5
+            WHERE data <= (SELECT aplicada_em FROM versao_esquema WHERE versao = 3)
+            """,
+        ],
+    }),
+    # Bancos criados antes da migração 1 podem ter a coluna 'senha' menor que o hash scrypt
+    # (cerca de 130 caracteres). No SQLite TEXT não tem limite de tamanho.
+    (4, "Coluna usuarios.senha com espaço para o hash da senha", {
+        'oracle': [
+            """
+            DECLARE
+                tamanho NUMBER;
+            BEGIN
+                SELECT char_length INTO tamanho FROM user_tab_columns
+                WHERE table_name = 'USUARIOS' AND column_name = 'SENHA';
+                IF tamanho < 255 THEN
+                    EXECUTE IMMEDIATE 'ALTER TABLE usuarios MODIFY (senha VARCHAR2(255))';
+                END IF;
+            END;
+            """,
+        ],
+        'sqlite': [],
+    }),
+]
+
+ddl_versao_esquema = {
+    'oracle': "CREATE TABLE versao_esquema (versao NUMBER PRIMARY KEY, descricao VARCHAR2(200), aplicada_em DATE DEFAULT SYSDATE)",
+    'sqlite': "CREATE TABLE IF NOT EXISTS versao_esquema (versao INTEGER PRIMARY KEY, descricao TEXT, aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP)",
+}
+
+def objeto_ja_existe(erro):
+    """
+    Indica se o erro do Oracle é de objeto já existente (ORA-00955) ou de colunas já
+    indexadas (ORA-01408), o que acontece em bancos criados antes das migrações.
+    """
+    return bool(erro.args) and getattr(erro.args[0], 'code', None) in (955, 1408)
+
+def executar_ddl(cursor, ddl):
+    try:
+        cursor.execute(ddl)
+    except Exception as e:
+        if not objeto_ja_existe(e):
+            raise
+
+def migrar_esquema(conn=None, dialeto=None):
+    """
+    Aplica, em ordem, as migrações ainda não registradas na tabela 'versao_esquema'.
+    Os backends chamam esta função na primeira conexão do processo. A versão é registrada
+    antes dos comandos, para que eles possam usar o próprio 'aplicada_em' como data de corte.
+
+    Parâmetros:
+    conn: Conexão a usar (padrão: uma conexão do backend em uso).
+    dialeto (str): 'oracle' ou 'sqlite' (padrão: o do backend em uso).
+
+    Retorna:
+    int: Versão do esquema após as migrações.
+    """
+    if conn is None:
+        with obter_conexao() as conn:
+            return migrar_esquema(conn, dialeto or obter_backend().nome)
+    dialeto = dialeto or obter_backend().nome
+
+    with closing(conn.cursor()) as cursor:
+        executar_ddl(cursor, ddl_versao_esquema[dialeto])
+        cursor.execute("SELECT versao FROM versao_esquema")
+        aplicadas = {linha[0] for linha in cursor.fetchall()}
+
+        for versao, descricao, comandos in migracoes:
+            if versao in aplicadas:
+                continue
+            cursor.execute(
+                "INSERT INTO versao_esquema (versao, descricao) VALUES (:versao, :descricao)",
+                {'versao': versao, 'descricao': descricao}
+            )
+            try:
+                for ddl in comandos[dialeto]:
+                    executar_ddl(cursor, ddl)
+            except Exception:
+                # No Oracle cada DDL confirma a transação: o registro da versão é removido à parte
+                conn.rollback()
+                cursor.execute("DELETE FROM versao_esquema WHERE versao = :versao", {'versao': versao})
+                conn.commit()
+                raise
+            conn.commit()
+            aplicadas.add(versao)
+
+    return max(aplicadas, default=0)
+
+# Consultas mais frequentes do sistema e os valores usados para analisar o plano de cada uma
+consultas_criticas = {
+    'simulações ativas do usuário': (
+        "SELECT * FROM simulacoes WHERE usuario_id = :usuario_id AND ativo = 'T'",
+        {'usuario_id': 1},
+    ),
+    'filtro numérico do usuário': (
+        "SELECT * FROM simulacoes WHERE usuario_id = :usuario_id AND ativo = 'T' AND consumo > :valor",
+        {'usuario_id': 1, 'valor': 100},
+    ),
+    'simulação por ID': (
+        "SELECT usuario_id FROM simulacoes WHERE simulacao_id = :simulacao_id AND ativo = 'T'",
+        {'simulacao_id': 1},
+    ),
+    'login por email': (
+        "SELECT usuario_id FROM usuarios WHERE email = :email",
+        {'email': 'antonio22@gmail.com'},
+    ),
+}
+
+def verificar_planos_consultas(exibir=True):
+    """
+    Confere no plano de execução (EXPLAIN) que as consultas críticas usam índices em vez
+    de varrer a tabela inteira.
+
+    Retorna:
+    dict: {consulta: (usa_indice, plano)}.
+    """
+    backend_atual = obter_backend()
+    resultado = {}
+    with obter_conexao() as conn, closing(conn.cursor()) as cursor:
+        for descricao, (query, params) in consultas_criticas.items():
+            plano = backend_atual.plano_execucao(cursor, query, params)
+            texto = plano.upper()
+            varredura = 'TABLE ACCESS FULL' in texto or any(linha.strip().startswith('SCAN') for linha in texto.splitlines())
+            usa_indice = ('INDEX' in texto or 'PRIMARY KEY' in texto) and not varredura
+            resultado[descricao] = (usa_indice, plano)
+            if exibir:
+                print(f"{'OK ' if usa_indice else 'SEM ÍNDICE'} | {descricao}")
+                if not usa_indice:
+                    print(plano)
+    return resultado
 
 
 # =========================================================================================
 # Funções de Utilidade
 # =========================================================================================
 def limpar_tela():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    # Sequência ANSI em vez de os.system('cls'/'clear'): não abre um processo a cada tela e
+    # não faz nada quando a saída não é um terminal (pipes, arquivos, cron)
+    if sys.stdout.isatty():
+        print("\033[2J\033[H", end='', flush=True)
 
 def validar_numero(numero):
     try:
@@ -104,6 +708,252 @@ estados_UF = [
     "TO"   # Tocantins
 ]
 
+# Produção solar por UF: irradiação média de cada estado, calibrada para que a média nacional
+# fique próxima dos 150 kWh/m²/ano usados como padrão quando o estado não é informado
+arquivo_producao_uf = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'producao_solar_uf.csv')
+producao_padrao_m2 = 150
+
+@lru_cache(maxsize=1)
+def carregar_producao_uf():
+    """
+    Lê uma única vez a tabela de produção por UF do arquivo 'producao_solar_uf.csv'.
+
+    Retorna:
+    tuple: (array ordenado com as siglas das UFs, array com a produção de energia por m² por ano em kWh).
+    """
+    import csv
+    import numpy as np
+
+    with open(arquivo_producao_uf, encoding='utf-8', newline='') as arquivo:
+        linhas = sorted(csv.DictReader(arquivo), key=lambda linha: linha['uf'])
+    return np.array([linha['uf'] for linha in linhas]), np.array([float(linha['producao_kwh_m2_ano']) for linha in linhas])
+
+def producao_por_estado(estado):
+    """
+    Produção de energia por m² por ano (kWh) de cada estado, por junção vetorizada na tabela
+    por UF (busca binária em C sobre as 27 siglas, sem laço em Python). UFs desconhecidas
+    resultam em NaN.
+    """
+    import numpy as np
+
+    ufs, producao = carregar_producao_uf()
+    siglas = np.asarray(estado, dtype=str)
+    posicoes = np.minimum(np.searchsorted(ufs, siglas), len(ufs) - 1)
+    return np.where(ufs[posicoes] == siglas, producao[posicoes], np.nan)
+
+# Colunas da tabela 'simulacoes', na ordem retornada por SELECT *
+colunas_simulacoes = ['simulacao_id', 'nome', 'tamanho_disp', 'estado', 'consumo', 'orcamento', 'custo_investimento', 'economia_anual', 'data', 'usuario_id', 'ativo']
+
+# Colunas exportadas nos relatórios de resultados
+colunas_resultados = ['simulacao_id', 'custo_investimento', 'economia_anual', 'tempo_para_lucro_anos', 'economia_mensal_R$', 'reducao_carbono_KG']
+
+
+# =========================================================================================
+# Armazenamento Compacto de Simulações
+# =========================================================================================
+# Colunas lidas por 'consultar_simulacoes_compactas' (sem 'data', 'usuario_id' e 'ativo')
+colunas_compactas = ['simulacao_id', 'nome', 'tamanho_disp', 'estado', 'consumo', 'orcamento', 'custo_investimento', 'economia_anual']
+
+class TextosCompactos:
+    """
+    Coluna de textos em um único buffer UTF-8 com as posições de início de cada texto (o mesmo
+    layout das strings do Arrow): cada texto ocupa só os próprios bytes, sem objeto str por
+    valor e sem completar todos até o tamanho do maior.
+    """
+
+    def __init__(self, textos):
+        import numpy as np
+
+        codificados = [str(texto).encode() for texto in textos]
+        self.posicoes = np.zeros(len(codificados) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, codificados), dtype=np.int64, count=len(codificados)), out=self.posicoes[1:])
+        self.buffer = np.frombuffer(b''.join(codificados), dtype=np.uint8)
+
+    @property
+    def nbytes(self):
+        return self.posicoes.nbytes + self.buffer.nbytes
+
+    def __len__(self):
+        return len(self.posicoes) - 1
+
+    def para_array(self):
+        """
+        Decodifica em um array NumPy de str (objetos criados só nesse momento).
+        """
+        import numpy as np
+
+        conteudo = self.buffer.tobytes()
+        textos = np.empty(len(self), dtype=object)
+        textos[:] = [conteudo[inicio:fim].decode() for inicio, fim in zip(self.posicoes[:-1].tolist(), self.posicoes[1:].tolist())]
+        return textos
+
+    def para_arrow(self):
+        """
+        pyarrow.LargeStringArray sobre os mesmos buffers (sem cópia).
+        """
+        import pyarrow as pa
+
+        return pa.LargeStringArray.from_buffers(len(self), pa.py_buffer(self.posicoes), pa.py_buffer(self.buffer))
+
+class SimulacoesCompactas:
+    """
+    Simulações em memória como colunas de arrays NumPy tipados, sem um objeto Python por
+    valor: números em int64/float64, 'estado' como código int8 da UF (-1 para UF desconhecida)
+    e 'nome' como TextosCompactos (um buffer UTF-8 com as posições de cada nome). Pode ser passado no lugar do DataFrame para
+    'calcular_economias', 'gerar_aviso', 'acessar_economias' e as funções de exportação.
+
+    df['coluna'] retorna o array da coluna ('estado' volta como texto) e df[lista de colunas]
+    retorna outro SimulacoesCompactas que compartilha os mesmos buffers.
+    """
+    tipos = {
+        'simulacao_id': 'int64',
+        'usuario_id': 'int64',
+        'tamanho_disp': 'float64',
+        'consumo': 'float64',
+        'orcamento': 'float64',
+        'custo_investimento': 'float64',
+        'economia_anual': 'float64',
+        'estado': str,
+    }
+    colunas_texto = ('nome',)
+
+    def __init__(self, colunas):
+        """
+        Parâmetros:
+        colunas (dict): {nome da coluna: valores} com arrays NumPy, listas, pd.Series ou
+        colunas Arrow (ex.: saída de 'buscar_colunas' dos backends).
+        """
+        import numpy as np
+
+        self.dados = {}
+        for nome, valores in colunas.items():
+            if hasattr(valores, 'to_numpy'):
+                valores = valores.to_numpy()
+            if nome == 'estado':
+                self.dados[nome] = self.codificar_estados(valores)
+            elif nome in self.colunas_texto:
+                self.dados[nome] = TextosCompactos(valores)
+            else:
+                self.dados[nome] = np.asarray(valores, dtype=self.tipos.get(nome))
+
+    @staticmethod
+    def categorias_estado():
+        import numpy as np
+        return np.array(sorted(estados_UF))
+
+    @classmethod
+    def codificar_estados(cls, estados):
+        import numpy as np
+
+        categorias = cls.categorias_estado()
+        siglas = np.asarray(estados, dtype=str)
+        posicoes = np.minimum(np.searchsorted(categorias, siglas), len(categorias) - 1)
+        return np.where(categorias[posicoes] == siglas, posicoes, -1).astype(np.int8)
+
+    @classmethod
+    def de_dataframe(cls, df):
+        return cls({coluna: df[coluna] for coluna in df.columns if coluna not in ('data', 'ativo')})
+
+    @property
+    def columns(self):
+        return list(self.dados)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def nbytes(self):
+        """
+        Memória ocupada pelos buffers das colunas (o texto dos nomes incluído).
+        """
+        return sum(valores.nbytes for valores in self.dados.values())
+
+    def __len__(self):
+        return len(next(iter(self.dados.values()), ()))
+
+    def __getitem__(self, chave):
+        if isinstance(chave, str):
+            if chave == 'estado':
+                import numpy as np
+                # Código -1 (UF desconhecida) cai no último elemento: texto vazio
+                return np.append(self.categorias_estado(), '')[self.dados['estado']]
+            if isinstance(self.dados[chave], TextosCompactos):
+                return self.dados[chave].para_array()
+            return self.dados[chave]
+
+        compactas = SimulacoesCompactas.__new__(SimulacoesCompactas)
+        compactas.dados = {coluna: self.dados[coluna] for coluna in chave}
+        return compactas
+
+    def com_colunas(self, **novas):
+        """
+        Retorna uma cópia rasa (mesmos buffers) com colunas adicionadas ou substituídas.
+        """
+        compactas = self[self.columns]
+        compactas.dados.update(novas)
+        return compactas
+
+    def para_dataframe(self):
+        """
+        Converte em pd.DataFrame, com 'estado' como pd.Categorical (sem repetir o texto das UFs).
+        """
+        import pandas as pd
+
+        colunas = {nome: self[nome] if isinstance(valores, TextosCompactos) else valores for nome, valores in self.dados.items()}
+        if 'estado' in colunas:
+            colunas['estado'] = pd.Categorical.from_codes(colunas['estado'], self.categorias_estado())
+        return pd.DataFrame(colunas)
+
+    def para_arrow(self):
+        """
+        Converte em pyarrow.Table; colunas numéricas sem cópia e 'estado' como dicionário.
+        """
+        import pyarrow as pa
+
+        colunas = {}
+        for nome, valores in self.dados.items():
+            if nome == 'estado':
+                colunas[nome] = pa.DictionaryArray.from_arrays(
+                    pa.array(valores, mask=valores < 0), pa.array(self.categorias_estado())
+                )
+            elif isinstance(valores, TextosCompactos):
+                colunas[nome] = valores.para_arrow()
+            else:
+                colunas[nome] = pa.array(valores)
+        return pa.table(colunas)
+
+def como_dataframe(dados):
+    """
+    Retorna um pd.DataFrame a partir de um DataFrame ou de um SimulacoesCompactas.
+    """
+    return dados.para_dataframe() if isinstance(dados, SimulacoesCompactas) else dados
+
+def consultar_simulacoes_compactas(usuario_id, colunas=None, tamanho_bloco=5000):
+    """
+    Lê as simulações ativas do usuário direto para arrays tipados, sem montar tuplas nem
+    DataFrame de objetos Python; buscar só as colunas necessárias reduz ainda mais a memória.
+
+    Parâmetros:
+    usuario_id (int): ID do usuário.
+    colunas (list): Colunas de 'colunas_simulacoes' a ler (padrão: 'colunas_compactas').
+    tamanho_bloco (int): Linhas buscadas por ida ao banco.
+
+    Retorna:
+    SimulacoesCompactas: Simulações ordenadas por 'simulacao_id'.
+    """
+    colunas = list(colunas or colunas_compactas)
+    invalidas = [coluna for coluna in colunas if coluna not in colunas_simulacoes]
+    if invalidas:
+        raise ValueError(f"Colunas inválidas: {', '.join(invalidas)}")
+
+    query = f"""
+    SELECT {', '.join(colunas)} FROM simulacoes
+    WHERE usuario_id = :usuario_id AND ativo = 'T'
+    ORDER BY simulacao_id
+    """
+    with obter_conexao() as conn:
+        return SimulacoesCompactas(obter_backend().buscar_colunas(conn, query, {'usuario_id': usuario_id}, tamanho_bloco))
 
 # =========================================================================================
 # Funções de Exportação
@@ -113,19 +963,18 @@ def exportar_para_excel(df_resultados, nome_arquivo_excel='resultados_simulacoes
     Exporta os resultados das simulações para o formato Excel.
 
     Parâmetros:
-    df_resultados (pd.DataFrame): DataFrame contendo os resultados das simulações.
+    df_resultados (pd.DataFrame | SimulacoesCompactas): Resultados das simulações.
     nome_arquivo_excel (str): Nome do arquivo Excel a ser salvo (padrão: 'resultados_simulacoes.xlsx').
     """
-    colunas_resultados = ['simulacao_id', 'custo_investimento', 'economia_anual', 'tempo_para_lucro_anos', 'economia_mensal_R$', 'reducao_carbono_KG']
-    
     if all(coluna in df_resultados.columns for coluna in colunas_resultados):
         if df_resultados.empty:
             print("Erro: O DataFrame está vazio. Não há dados para exportar.")
             return
         
         try:
-            df_resultados[colunas_resultados].to_excel(nome_arquivo_excel, index=False)
+            como_dataframe(df_resultados[colunas_resultados]).to_excel(nome_arquivo_excel, index=False)
             print(f"Resultados exportados para {nome_arquivo_excel}")
+            return nome_arquivo_excel
         except Exception as e:
             print(f"Erro ao exportar para Excel: {e}")
     else:
@@ -136,11 +985,9 @@ def exportar_para_json(df_resultados, nome_arquivo_json='resultados_simulacoes.j
     Exporta os resultados das simulações para o formato JSON.
 
     Parâmetros:
-    df_resultados (pd.DataFrame): DataFrame contendo os resultados das simulações.
+    df_resultados (pd.DataFrame | SimulacoesCompactas): Resultados das simulações.
     nome_arquivo_json (str): Nome do arquivo JSON a ser salvo (padrão: 'resultados_simulacoes.json').
     """
-    colunas_resultados = ['simulacao_id', 'custo_investimento', 'economia_anual', 'tempo_para_lucro_anos', 'economia_mensal_R$', 'reducao_carbono_KG']
-    
     if all(coluna in df_resultados.columns for coluna in colunas_resultados):
         if df_resultados.empty:
             print("Erro: O DataFrame está vazio. Não há dados para exportar.")
@@ -150,110 +997,723 @@ def exportar_para_json(df_resultados, nome_arquivo_json='resultados_simulacoes.j
             if not nome_arquivo_json.endswith('.json'):
                 nome_arquivo_json = nome_arquivo_json.rsplit('.', 1)[0] + '.json'
             
-            df_resultados[colunas_resultados].to_json(nome_arquivo_json, orient='records', lines=True)
+            como_dataframe(df_resultados[colunas_resultados]).to_json(nome_arquivo_json, orient='records', lines=True)
             print(f"Resultados exportados para {nome_arquivo_json}")
+            return nome_arquivo_json
         except Exception as e:
             print(f"Erro ao exportar para JSON: {e}")
     else:
         print("Erro: O DataFrame não contém as colunas necessárias para os cálculos!")
 
+def exportar_para_parquet(df_resultados, nome_arquivo_parquet='resultados_simulacoes.parquet', compressao='zstd'):
+    """
+    Exporta os resultados das simulações para o formato colunar Parquet.
+
+    Parâmetros:
+    df_resultados (pd.DataFrame | SimulacoesCompactas): Resultados das simulações.
+    nome_arquivo_parquet (str): Nome do arquivo Parquet a ser salvo (padrão: 'resultados_simulacoes.parquet').
+    compressao (str): Codec de compressão: 'zstd' (padrão), 'snappy' ou None.
+    """
+    if all(coluna in df_resultados.columns for coluna in colunas_resultados):
+        if df_resultados.empty:
+            print("Erro: O DataFrame está vazio. Não há dados para exportar.")
+            return
+
+        try:
+            import pyarrow.parquet as pq
+
+            pq.write_table(resultados_para_arrow(df_resultados), nome_arquivo_parquet, compression=compressao or 'none')
+            print(f"Resultados exportados para {nome_arquivo_parquet}")
+            return nome_arquivo_parquet
+        except Exception as e:
+            print(f"Erro ao exportar para Parquet: {e}")
+    else:
+        print("Erro: O DataFrame não contém as colunas necessárias para os cálculos!")
+
+def exportar_para_csv(df_resultados, nome_arquivo_csv='resultados_simulacoes.csv.gz', compressao='infer'):
+    """
+    Exporta os resultados das simulações para CSV, comprimido conforme a extensão do arquivo
+    ('.gz', '.zst', '.bz2', '.xz' ou '.zip'; '.csv' sem compressão).
+
+    Parâmetros:
+    df_resultados (pd.DataFrame | SimulacoesCompactas): Resultados das simulações.
+    nome_arquivo_csv (str): Nome do arquivo CSV a ser salvo (padrão: 'resultados_simulacoes.csv.gz').
+    compressao (str): Codec de compressão (padrão: 'infer', deduzido pela extensão).
+    """
+    if all(coluna in df_resultados.columns for coluna in colunas_resultados):
+        if df_resultados.empty:
+            print("Erro: O DataFrame está vazio. Não há dados para exportar.")
+            return
+
+        try:
+            como_dataframe(df_resultados[colunas_resultados]).to_csv(nome_arquivo_csv, index=False, compression=compressao)
+            print(f"Resultados exportados para {nome_arquivo_csv}")
+            return nome_arquivo_csv
+        except Exception as e:
+            print(f"Erro ao exportar para CSV: {e}")
+    else:
+        print("Erro: O DataFrame não contém as colunas necessárias para os cálculos!")
+
+def exportar_para_arrow(df_resultados, nome_arquivo_arrow='resultados_simulacoes.arrow', compressao=None):
+    """
+    Exporta os resultados das simulações no formato Arrow IPC (Feather v2). Sem compressão
+    (padrão), o arquivo pode ser aberto com memory-map e lido sem cópia pelo pipeline de BI.
+
+    Parâmetros:
+    df_resultados (pd.DataFrame | SimulacoesCompactas): Resultados das simulações.
+    nome_arquivo_arrow (str): Nome do arquivo Arrow a ser salvo (padrão: 'resultados_simulacoes.arrow').
+    compressao (str): None (padrão, leitura zero-copy), 'zstd' ou 'lz4'.
+    """
+    if all(coluna in df_resultados.columns for coluna in colunas_resultados):
+        if df_resultados.empty:
+            print("Erro: O DataFrame está vazio. Não há dados para exportar.")
+            return
+
+        try:
+            import pyarrow.feather as feather
+
+            feather.write_feather(resultados_para_arrow(df_resultados), nome_arquivo_arrow, compression=compressao or 'uncompressed')
+            print(f"Resultados exportados para {nome_arquivo_arrow}")
+            return nome_arquivo_arrow
+        except Exception as e:
+            print(f"Erro ao exportar para Arrow: {e}")
+    else:
+        print("Erro: O DataFrame não contém as colunas necessárias para os cálculos!")
+
+def resultados_para_arrow(df_resultados):
+    """
+    Converte os resultados das simulações em uma tabela Arrow (pyarrow.Table) com as colunas
+    de 'colunas_resultados', para consumo em memória sem passar por arquivo.
+    """
+    import pyarrow as pa
+
+    if isinstance(df_resultados, SimulacoesCompactas):
+        return df_resultados[colunas_resultados].para_arrow()
+    return pa.Table.from_pandas(df_resultados[colunas_resultados], preserve_index=False)
+
+def ler_resultados_arrow(nome_arquivo_arrow):
+    """
+    Abre um arquivo exportado por 'exportar_para_arrow' com memory-map (sem cópia quando não comprimido).
+    """
+    import pyarrow.feather as feather
+
+    return feather.read_table(nome_arquivo_arrow, memory_map=True)
+
+# Formatos de exportação disponíveis: extensão do arquivo e função exportadora
+exportadores = {
+    'xlsx': ('.xlsx', exportar_para_excel),
+    'json': ('.json', exportar_para_json),
+    'parquet': ('.parquet', exportar_para_parquet),
+    'csv': ('.csv.gz', exportar_para_csv),
+    'arrow': ('.arrow', exportar_para_arrow),
+}
+
+class CacheResultados:
+    """
+    Cache, por usuário, das economias já calculadas (saída de 'calcular_economias').
+
+    Cada simulação é guardada com todas as colunas lidas do banco; ao atualizar, só simulações
+    novas ou com alguma coluna diferente (inclusive nome e orçamento) são recalculadas. As entradas
+    expiram após 'ttl' segundos (alterações feitas por outros processos) e, acima de 'max_usuarios',
+    o usuário usado há mais tempo é descartado (LRU).
+    """
+
+    def __init__(self, max_usuarios=64, ttl=300):
+        self.max_usuarios = max_usuarios
+        self.ttl = ttl
+        self.entradas = OrderedDict()
+        self.trava = threading.Lock()
+
+    def obter(self, usuario_id):
+        """
+        Retorna as economias do usuário se estiverem em cache, válidas e sem alterações pendentes.
+        """
+        with self.trava:
+            entrada = self.entradas.get(usuario_id)
+            if entrada is None or entrada['alterado'] or time.monotonic() - entrada['atualizado_em'] > self.ttl:
+                return None
+            self.entradas.move_to_end(usuario_id)
+            return entrada['economias']
+
+    def atualizar(self, usuario_id, df_simulacoes):
+        """
+        Atualiza o cache com as simulações lidas do banco, recalculando apenas as novas ou alteradas.
+        """
+        import pandas as pd
+
+        with self.trava:
+            entrada = self.entradas.get(usuario_id)
+        anteriores = entrada['economias'].set_index('simulacao_id') if entrada is not None else None
+
+        atuais = df_simulacoes.set_index('simulacao_id')
+        reaproveitados = atuais.index[:0]
+        if anteriores is not None:
+            # A linha inteira é a versão: qualquer coluna alterada no banco invalida a linha em cache
+            comuns = atuais.index.intersection(anteriores.index)
+            gravados, em_cache = atuais.loc[comuns], anteriores.loc[comuns, atuais.columns]
+            iguais = ((gravados == em_cache) | (gravados.isna() & em_cache.isna())).all(axis=1)
+            reaproveitados = comuns[iguais.to_numpy()]
+
+        recalcular = df_simulacoes[~df_simulacoes['simulacao_id'].isin(reaproveitados)]
+        partes = [calcular_economias(recalcular)]
+        if len(reaproveitados):
+            partes.insert(0, anteriores.loc[reaproveitados].reset_index())
+        economias = pd.concat(partes, ignore_index=True).sort_values('simulacao_id', ignore_index=True)
+
+        with self.trava:
+            self.entradas[usuario_id] = {'economias': economias, 'atualizado_em': time.monotonic(), 'alterado': False}
+            self.entradas.move_to_end(usuario_id)
+            while len(self.entradas) > self.max_usuarios:
+                self.entradas.popitem(last=False)
+        return economias
+
+    def marcar_alterado(self, usuario_id):
+        """
+        Simulações do usuário foram criadas ou editadas: a próxima leitura consulta o banco
+        e recalcula só o que mudou.
+        """
+        with self.trava:
+            if usuario_id in self.entradas:
+                self.entradas[usuario_id]['alterado'] = True
+
+    def atualizar_simulacao(self, usuario_id, simulacao_id, valores):
+        """
+        Simulação editada: recalcula apenas essa linha com os novos valores, sem consultar o banco.
+        """
+        import pandas as pd
+
+        with self.trava:
+            entrada = self.entradas.get(usuario_id)
+            if entrada is None:
+                return
+            economias = entrada['economias']
+            posicao = economias.index[economias['simulacao_id'] == simulacao_id]
+            if len(posicao) == 0:
+                entrada['alterado'] = True
+                return
+
+            linha = economias.loc[posicao].assign(**valores)
+            economias = economias.copy()
+            economias.loc[posicao] = calcular_economias(linha)[economias.columns].to_numpy()
+            entrada['economias'] = economias
+
+    def remover_simulacoes(self, usuario_id, simulacao_ids):
+        """
+        Simulações excluídas: removidas do cache sem precisar consultar o banco novamente.
+        """
+        with self.trava:
+            entrada = self.entradas.get(usuario_id)
+            if entrada is not None:
+                economias = entrada['economias']
+                entrada['economias'] = economias[~economias['simulacao_id'].isin(simulacao_ids)].reset_index(drop=True)
+
+    def descartar(self, usuario_id=None):
+        with self.trava:
+            if usuario_id is None:
+                self.entradas.clear()
+            else:
+                self.entradas.pop(usuario_id, None)
+
+cache_resultados = CacheResultados()
+
+def obter_economias(usuario_id, atualizar=False):
+    """
+    Retorna as economias calculadas de todas as simulações do usuário, usando o cache de
+    resultados. Use atualizar=True para ignorar o cache e reler o banco.
+
+    Retorna:
+    pd.DataFrame: Vazio se o usuário não tiver simulações. Erros do banco são propagados.
+    """
+    import pandas as pd
+
+    economias = None if atualizar else cache_resultados.obter(usuario_id)
+    if economias is None:
+        blocos = list(consultar_simulacoes_em_blocos(usuario_id))
+        df_simulacoes = pd.concat(blocos, ignore_index=True) if blocos else pd.DataFrame(columns=colunas_simulacoes)
+        economias = cache_resultados.atualizar(usuario_id, df_simulacoes)
+    return economias
+
+def obter_resultados(usuario_id, atualizar=False):
+    """
+    Retorna o relatório de resultados do usuário (gerar_aviso) a partir do cache de economias.
+    """
+    return gerar_aviso(obter_economias(usuario_id, atualizar))
+
+def invalidar_resultados(usuario_id, simulacoes_removidas=None):
+    """
+    Atualiza o cache após criar, editar ou excluir simulações do usuário.
+
+    Parâmetros:
+    usuario_id (int): ID do usuário.
+    simulacoes_removidas (list): IDs excluídos, retirados do cache diretamente. Sem ele,
+    o cache é marcado como alterado e revalidado na próxima leitura.
+    """
+    if simulacoes_removidas is not None:
+        cache_resultados.remover_simulacoes(usuario_id, simulacoes_removidas)
+    else:
+        cache_resultados.marcar_alterado(usuario_id)
+
+def exportar_resultados(df_resultados, nome_arquivo='resultados_simulacoes', formatos=('xlsx', 'json')):
+    """
+    Exporta o mesmo DataFrame de resultados para vários formatos ao mesmo tempo, com uma thread
+    por formato (a escrita dos arquivos é limitada por I/O).
+
+    Parâmetros:
+    df_resultados (pd.DataFrame | SimulacoesCompactas): Resultados das simulações.
+    nome_arquivo (str): Nome base dos arquivos; a extensão de cada formato é adicionada.
+    formatos (iterable): Chaves de 'exportadores' (padrão: Excel e JSON).
+
+    Retorna:
+    list: Nomes dos arquivos gerados (os formatos que falharam ficam de fora).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    formatos = [formato for formato in formatos if formato in exportadores]
+    if not formatos:
+        print("Erro: Nenhum formato de exportação válido informado.")
+        return []
+
+    # Remove a extensão informada pelo usuário, se for de um dos formatos conhecidos
+    for extensao, _ in exportadores.values():
+        if nome_arquivo.endswith(extensao):
+            nome_arquivo = nome_arquivo[:-len(extensao)]
+            break
+
+    arquivos = [nome_arquivo + exportadores[formato][0] for formato in formatos]
+    with ThreadPoolExecutor(max_workers=len(formatos)) as executor:
+        tarefas = [
+            executor.submit(exportadores[formato][1], df_resultados, arquivo)
+            for formato, arquivo in zip(formatos, arquivos)
+        ]
+        gerados = [tarefa.result() for tarefa in tarefas]
+
+    # Cada exportador retorna o arquivo gravado, ou None se falhou (o erro já foi exibido)
+    return [arquivo for arquivo in gerados if arquivo]
+
+def consultar_simulacoes_em_blocos(usuario_id, tamanho_bloco=5000):
+    """
+    Lê as simulações ativas do usuário em blocos (fetchmany), sem carregar o histórico inteiro.
+
+    Parâmetros:
+    usuario_id (int): ID do usuário.
+    tamanho_bloco (int): Linhas buscadas por ida ao banco (cursor.arraysize).
+
+    Retorna:
+    Gerador de pd.DataFrame com as colunas de 'colunas_simulacoes'.
+    """
+    import pandas as pd
+
+    query = "SELECT * FROM simulacoes WHERE usuario_id = :usuario_id AND ativo = 'T'"
+    with obter_conexao() as conn, closing(conn.cursor()) as cursor:
+        obter_backend().ajustar_cursor(cursor, tamanho_bloco)
+        cursor.execute(query, {'usuario_id': usuario_id})
+        while True:
+            linhas = cursor.fetchmany(tamanho_bloco)
+            if not linhas:
+                break
+            yield pd.DataFrame(linhas, columns=colunas_simulacoes)
+
+def exportar_em_streaming(usuario_id, nome_arquivo='resultados_simulacoes.jsonl', tamanho_bloco=5000):
+    """
+    Exporta os resultados das simulações bloco a bloco, com uso de memória limitado ao tamanho
+    do bloco independentemente da quantidade de simulações. O formato é definido pela extensão:
+    '.xlsx' (planilha write-only do openpyxl) ou '.json'/'.jsonl' (JSON Lines).
+
+    Parâmetros:
+    usuario_id (int): ID do usuário.
+    nome_arquivo (str): Nome do arquivo a ser salvo (padrão: 'resultados_simulacoes.jsonl').
+    tamanho_bloco (int): Simulações buscadas e calculadas por vez.
+
+    Retorna:
+    int: Quantidade de simulações exportadas, ou None se a exportação falhar.
+    """
+    total = 0
+    blocos = (gerar_aviso(calcular_economias(bloco)) for bloco in consultar_simulacoes_em_blocos(usuario_id, tamanho_bloco))
+
+    try:
+        if nome_arquivo.endswith('.xlsx'):
+            from openpyxl import Workbook
+
+            planilha = Workbook(write_only=True)
+            aba = planilha.create_sheet()
+            aba.append(colunas_resultados)
+            for bloco in blocos:
+                # Células vazias para valores ausentes (ex.: payback indefinido)
+                for linha in bloco.astype(object).where(bloco.notna(), None).itertuples(index=False, name=None):
+                    aba.append(linha)
+                total += len(bloco)
+            planilha.save(nome_arquivo)
+        elif nome_arquivo.endswith(('.json', '.jsonl')):
+            with open(nome_arquivo, 'w', encoding='utf-8') as arquivo:
+                for bloco in blocos:
+                    arquivo.write(bloco.to_json(orient='records', lines=True).rstrip('\n') + '\n')
+                    total += len(bloco)
+        else:
+            print("Erro: Formato não suportado para exportação em streaming (use .xlsx, .json ou .jsonl).")
+            return None
+    except Exception as e:
+        print(f"Erro ao exportar para {nome_arquivo}: {e}")
+        return None
+
+    if total == 0:
+        print("Nenhuma simulação encontrada para exportar.")
+    else:
+        print(f"{total} resultados exportados para {nome_arquivo}")
+    return total
+
 
 # =========================================================================================
 # Funções de Simulação
 # =========================================================================================
-def criar_simulacao(usuario_id, nome, tamanho_disp, estado, consumo, orcamento):
-    custo_por_m2 = 1000  # Custo do sistema por metro quadrado de painel solar (em R$)
-    producao_por_m2 = 150  # Produção de energia por m² de painel solar por ano (em kWh)
-    preco_kwh = 0.50  # Preço médio de venda da energia em R$ por kWh
+def calcular_simulacoes(tamanho_disp, consumo, orcamento, estado=None, custo_por_m2=1000, producao_por_m2=None, preco_kwh=0.50):
+    """
+    Modelo financeiro do simulador, sem interação com o usuário nem com o banco de dados.
+    Aceita valores escalares ou arrays (com broadcasting do NumPy) e avalia todas as
+    simulações de uma só vez.
+
+    Parâmetros:
+    tamanho_disp (array-like): Área disponível para os painéis (em m²).
+    consumo (array-like): Consumo energético mensal (em kWh).
+    orcamento (array-like): Orçamento disponível (em R$).
+    estado (array-like): Sigla do estado (UF) de cada simulação (opcional).
+    custo_por_m2 (array-like): Custo do sistema por metro quadrado de painel solar (em R$).
+    producao_por_m2 (array-like): Produção de energia por m² de painel solar por ano (em kWh).
+    Padrão: a produção da UF de cada simulação ('producao_solar_uf.csv') ou, sem estado, 150.
+    preco_kwh (array-like): Preço médio de venda da energia em R$ por kWh.
+
+    Retorna:
+    dict: Arrays 'custo_investimento', 'energia_gerada_anual', 'economia_anual' (energia
+    aproveitada x tarifa, mesma base do payback, do Monte Carlo e da projeção de fluxo de caixa),
+    'orcamento_suficiente', 'falta_orcamento' e 'valida' (entradas positivas e UF conhecida).
+    """
+    import numpy as np
+
+    tamanho_disp = np.asarray(tamanho_disp, dtype=float)
+    consumo = np.asarray(consumo, dtype=float)
+    orcamento = np.asarray(orcamento, dtype=float)
 
     # Verificação de valores de entrada
-    if tamanho_disp <= 0 or consumo <= 0 or orcamento <= 0:
-        print("Erro: Todos os valores de entrada devem ser positivos.")
-        return
+    valida = (tamanho_disp > 0) & (consumo > 0) & (orcamento > 0)
+    if estado is not None:
+        valida &= np.isin(np.asarray(estado, dtype=object), estados_UF)
+
+    if producao_por_m2 is None:
+        producao_por_m2 = producao_padrao_m2 if estado is None else producao_por_estado(estado)
 
     custo_investimento = tamanho_disp * custo_por_m2
     energia_gerada_anual = producao_por_m2 * tamanho_disp
-    economia_anual = (min(consumo * 12, energia_gerada_anual) * preco_kwh) * 5 
+    economia_anual = np.minimum(consumo * 12, energia_gerada_anual) * preco_kwh
+
+    return {
+        'custo_investimento': custo_investimento,
+        'energia_gerada_anual': energia_gerada_anual,
+        'economia_anual': economia_anual,
+        'orcamento_suficiente': orcamento >= custo_investimento,
+        'falta_orcamento': np.maximum(custo_investimento - orcamento, 0),
+        'valida': valida,
+    }
+
+def analisar_sensibilidade(consumo, tamanho_disp, custo_por_m2=(1000,), producao_por_m2=(150,), preco_kwh=(0.50,), orcamento=None):
+    """
+    Avalia uma simulação sobre uma grade de parâmetros (análise "e se" para propostas comerciais).
+    A grade é calculada de uma só vez com broadcasting do NumPy, sem laços em Python.
+
+    Parâmetros:
+    consumo (float): Consumo energético mensal (em kWh).
+    tamanho_disp (array-like): Áreas de painel avaliadas (em m²).
+    custo_por_m2, producao_por_m2, preco_kwh (array-like): Valores avaliados de cada parâmetro do modelo.
+    orcamento (float): Orçamento disponível (opcional; sem ele todos os cenários são considerados viáveis).
+
+    Retorna:
+    dict: 'eixos' (valores de cada dimensão, na ordem custo_por_m2, producao_por_m2, preco_kwh,
+    tamanho_disp) e as superfícies 'custo_investimento', 'economia_anual', 'economia_mensal',
+    'tempo_para_lucro_anos' (NaN quando não há economia) e 'orcamento_suficiente'.
+    """
+    import numpy as np
+
+    eixos = {
+        'custo_por_m2': np.asarray(custo_por_m2, dtype=float).ravel(),
+        'producao_por_m2': np.asarray(producao_por_m2, dtype=float).ravel(),
+        'preco_kwh': np.asarray(preco_kwh, dtype=float).ravel(),
+        'tamanho_disp': np.asarray(tamanho_disp, dtype=float).ravel(),
+    }
+
+    # Cada parâmetro ocupa uma dimensão da grade: (custo, produção, preço, área)
+    formas = [(-1, 1, 1, 1), (1, -1, 1, 1), (1, 1, -1, 1), (1, 1, 1, -1)]
+    custo, producao, preco, tamanho = (valores.reshape(forma) for valores, forma in zip(eixos.values(), formas))
+
+    resultado = calcular_simulacoes(
+        tamanho, consumo, np.inf if orcamento is None else orcamento,
+        custo_por_m2=custo, producao_por_m2=producao, preco_kwh=preco
+    )
+    forma_grade = tuple(len(valores) for valores in eixos.values())
+    custo_investimento = np.broadcast_to(resultado['custo_investimento'], forma_grade)
+    economia_anual = np.broadcast_to(resultado['economia_anual'], forma_grade)
+
+    tempo_para_lucro = np.full(forma_grade, np.nan)
+    np.divide(custo_investimento, economia_anual, out=tempo_para_lucro, where=economia_anual > 0)
+
+    return {
+        'eixos': eixos,
+        'custo_investimento': custo_investimento,
+        'economia_anual': economia_anual,
+        'economia_mensal': economia_anual / 12,
+        'tempo_para_lucro_anos': tempo_para_lucro,
+        'orcamento_suficiente': np.broadcast_to(resultado['orcamento_suficiente'], forma_grade),
+    }
+
+# Inserção de uma simulação já calculada
+consulta_inserir_simulacao = """
+INSERT INTO simulacoes (usuario_id, nome, tamanho_disp, estado, consumo, orcamento, custo_investimento, economia_anual)
+VALUES (:usuario_id, :nome, :tamanho_disp, :estado, :consumo, :orcamento, :custo_investimento, :economia_anual)
+"""
+
+def criar_simulacao(usuario_id, nome, tamanho_disp, estado, consumo, orcamento):
+    resultado = calcular_simulacoes(tamanho_disp, consumo, orcamento, estado)
+
+    # Verificação de valores de entrada
+    if not resultado['valida']:
+        print("Erro: Todos os valores de entrada devem ser positivos e o estado deve ser uma UF válida.")
+        return
+
+    custo_investimento = float(resultado['custo_investimento'])
+    economia_anual = float(resultado['economia_anual'])
 
     # Verifica se o orçamento é suficiente
-    if orcamento < custo_investimento:
-        print(f"\nAVISO: O seu orçamento de R${orcamento} não é suficiente para cobrir o custo de R${custo_investimento}. Faltam R${custo_investimento - orcamento:.2f}.")
+    if not resultado['orcamento_suficiente']:
+        print(f"\nAVISO: O seu orçamento de R${orcamento} não é suficiente para cobrir o custo de R${custo_investimento}. Faltam R${float(resultado['falta_orcamento']):.2f}.")
     else:
         print(f"\nParabéns! O seu orçamento de R${orcamento} é suficiente para cobrir o custo de R${custo_investimento}.\n")
 
     try:
-        query = """
-        INSERT INTO simulacoes (usuario_id, nome, tamanho_disp, estado, consumo, orcamento, custo_investimento, economia_anual)
-        VALUES (:usuario_id, :nome, :tamanho_disp, :estado, :consumo, :orcamento, :custo_investimento, :economia_anual)
-        """
-        cursor.execute(query, {
-            'usuario_id': usuario_id,
-            'nome': nome,
-            'tamanho_disp': tamanho_disp,
-            'estado': estado,
-            'consumo': consumo,
-            'orcamento': orcamento,
-            'custo_investimento': custo_investimento,
-            'economia_anual': economia_anual
-        })
-        conn.commit()
+        query = consulta_inserir_simulacao
+        with obter_conexao() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute(query, {
+                'usuario_id': usuario_id,
+                'nome': nome,
+                'tamanho_disp': tamanho_disp,
+                'estado': estado,
+                'consumo': consumo,
+                'orcamento': orcamento,
+                'custo_investimento': custo_investimento,
+                'economia_anual': economia_anual
+            })
+            conn.commit()
+        invalidar_resultados(usuario_id)
         print("Simulação criada com sucesso!")
         
         input("Pressione Enter para continuar...")
     except Exception as e:
         print(f"Erro ao inserir simulação: {e}")
 
+def inserir_simulacoes_em_lote(usuario_id, df, tamanho_lote=1000):
+    """
+    Grava as simulações de um DataFrame já calculado usando executemany (array DML do oracledb),
+    com um commit por lote. Erros de linhas individuais não interrompem o lote: são coletados
+    via batcherrors (ou equivalente, no SQLite).
+
+    Parâmetros:
+    usuario_id (int): ID do usuário dono das simulações.
+    df (pd.DataFrame): Colunas 'nome', 'tamanho_disp', 'estado', 'consumo', 'orcamento',
+    'custo_investimento' e 'economia_anual'.
+    tamanho_lote (int): Quantidade de linhas enviadas por executemany/commit.
+
+    Retorna:
+    tuple: (quantidade de linhas gravadas, lista de erros {'linha': índice no df, 'erro': mensagem}).
+    """
+    query = """
+    INSERT INTO simulacoes (usuario_id, nome, tamanho_disp, estado, consumo, orcamento, custo_investimento, economia_anual)
+    VALUES (:usuario_id, :nome, :tamanho_disp, :estado, :consumo, :orcamento, :custo_investimento, :economia_anual)
+    """
+    colunas = ['nome', 'tamanho_disp', 'estado', 'consumo', 'orcamento', 'custo_investimento', 'economia_anual']
+    inseridas = 0
+    erros = []
+
+    backend_atual = obter_backend()
+    with obter_conexao() as conn, closing(conn.cursor()) as cursor:
+        for inicio in range(0, len(df), tamanho_lote):
+            lote = df.iloc[inicio:inicio + tamanho_lote]
+            linhas = lote[colunas].assign(usuario_id=usuario_id).to_dict('records')
+            try:
+                erros_lote = backend_atual.executar_em_lote(cursor, query, linhas)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+            for posicao, mensagem in erros_lote:
+                erros.append({'linha': lote.index[posicao], 'erro': mensagem})
+            inseridas += len(linhas) - len(erros_lote)
+
+    if inseridas:
+        invalidar_resultados(usuario_id)
+    return inseridas, erros
+
+def criar_simulacoes_em_lote(usuario_id, nomes, tamanho_disp, estado, consumo, orcamento, persistir=True, tamanho_lote=None):
+    """
+    Avalia e grava várias simulações em uma única chamada, sem prints nem input().
+
+    Parâmetros:
+    usuario_id (int): ID do usuário dono das simulações.
+    nomes, tamanho_disp, estado, consumo, orcamento (array-like): Entradas de cada simulação.
+    persistir (bool): Se False, apenas calcula os resultados sem gravar no banco.
+    tamanho_lote (int): Linhas por executemany/commit (padrão: todas em uma única operação).
+
+    Retorna:
+    pd.DataFrame: Entradas e resultados de cada simulação, com as colunas 'valida' e 'gravada'.
+    Somente as simulações válidas são gravadas.
+    """
+    import numpy as np
+    import pandas as pd
+
+    resultado = calcular_simulacoes(tamanho_disp, consumo, orcamento, estado)
+    df = pd.DataFrame({
+        'nome': np.asarray(nomes, dtype=object),
+        'tamanho_disp': np.asarray(tamanho_disp, dtype=float),
+        'estado': np.asarray(estado, dtype=object),
+        'consumo': np.asarray(consumo, dtype=float),
+        'orcamento': np.asarray(orcamento, dtype=float),
+        **resultado,
+    })
+    df['gravada'] = False
+
+    if persistir:
+        validas = df[df['valida']]
+        if not validas.empty:
+            _, erros = inserir_simulacoes_em_lote(usuario_id, validas, tamanho_lote or len(validas))
+            df.loc[validas.index, 'gravada'] = True
+            df.loc[[erro['linha'] for erro in erros], 'gravada'] = False
+
+    return df
+
+def ler_lotes_simulacoes(origem, tamanho_lote=1000, formato=None):
+    """
+    Lê as entradas das simulações em lotes a partir de um arquivo CSV/JSON Lines/Parquet, de um
+    arquivo aberto (ex.: sys.stdin, informando o formato) ou de um DataFrame. Arquivos CSV e
+    JSON Lines são lidos em blocos, sem carregar o arquivo inteiro na memória.
+
+    Parâmetros:
+    formato (str): 'csv', 'jsonl' ou 'parquet' (padrão: deduzido pela extensão do arquivo).
+    """
+    import pandas as pd
+
+    if isinstance(origem, pd.DataFrame):
+        for inicio in range(0, len(origem), tamanho_lote):
+            yield origem.iloc[inicio:inicio + tamanho_lote]
+        return
+
+    # Nome e UF sempre como texto (ex.: uma simulação chamada "2024" não vira número)
+    tipos_texto = {'nome': str, 'estado': str}
+    formato = formato or str(origem).lower().rsplit('.', 1)[-1]
+    if formato == 'parquet':
+        df = pd.read_parquet(origem)
+        for inicio in range(0, len(df), tamanho_lote):
+            yield df.iloc[inicio:inicio + tamanho_lote]
+    elif formato == 'csv':
+        yield from pd.read_csv(origem, chunksize=tamanho_lote, dtype=tipos_texto)
+    elif formato in ('jsonl', 'json'):
+        yield from pd.read_json(origem, lines=True, chunksize=tamanho_lote, dtype=tipos_texto)
+    else:
+        raise ValueError(f"Formato de arquivo não suportado: {origem} (use .csv, .jsonl ou .parquet)")
+
+def importar_simulacoes(usuario_id, origem, tamanho_lote=1000):
+    """
+    Importação em massa de simulações (ex.: carga noturna) a partir de CSV, Parquet ou DataFrame.
+    Cada lote é calculado de forma vetorizada e gravado com um executemany e um commit.
+
+    Parâmetros:
+    usuario_id (int): ID do usuário dono das simulações.
+    origem (str | pd.DataFrame): Caminho do arquivo ou DataFrame com as colunas
+    'nome', 'tamanho_disp', 'estado', 'consumo' e 'orcamento'.
+    tamanho_lote (int): Linhas por lote (padrão: 1000).
+
+    Retorna:
+    dict: 'inseridas', 'invalidas' (índices das linhas rejeitadas na validação) e
+    'erros' (erros por linha reportados pelo banco).
+    """
+    colunas_entrada = ['nome', 'tamanho_disp', 'estado', 'consumo', 'orcamento']
+    relatorio = {'inseridas': 0, 'invalidas': [], 'erros': []}
+
+    for lote in ler_lotes_simulacoes(origem, tamanho_lote):
+        faltando = [coluna for coluna in colunas_entrada if coluna not in lote.columns]
+        if faltando:
+            raise ValueError(f"Colunas ausentes na origem: {faltando}")
+
+        resultado = calcular_simulacoes(lote['tamanho_disp'], lote['consumo'], lote['orcamento'], lote['estado'])
+        df = lote[colunas_entrada].assign(
+            custo_investimento=resultado['custo_investimento'],
+            economia_anual=resultado['economia_anual'],
+        )
+        valida = resultado['valida']
+
+        inseridas, erros = inserir_simulacoes_em_lote(usuario_id, df[valida], tamanho_lote)
+        relatorio['inseridas'] += inseridas
+        relatorio['invalidas'].extend(df.index[~valida].tolist())
+        relatorio['erros'].extend(erros)
+
+    return relatorio
+
+# Edição de uma simulação: só altera a linha se ela estiver ativa e pertencer ao usuário
+consulta_editar_simulacao = """
+UPDATE simulacoes
+SET nome = :nome, tamanho_disp = :tamanho_disp, estado = :estado,
+    consumo = :consumo, orcamento = :orcamento,
+    custo_investimento = :custo_investimento, economia_anual = :economia_anual
+WHERE simulacao_id = :simulacao_id AND usuario_id = :usuario_id AND ativo = 'T'
+"""
+
+def inativar_simulacoes(usuario_id, simulacao_ids, tamanho_lote=1000):
+    """
+    Exclui (inativa) várias simulações do usuário, com um executemany por lote. A posse é
+    conferida no próprio UPDATE: IDs de outros usuários, inexistentes ou já inativos são ignorados.
+
+    Parâmetros:
+    usuario_id (int): ID do usuário dono das simulações.
+    simulacao_ids (iterable): IDs das simulações a excluir.
+    tamanho_lote (int): IDs enviados por executemany/commit.
+
+    Retorna:
+    list: IDs efetivamente inativados.
+    """
+    query = """
+    UPDATE simulacoes
+    SET ativo = 'F'
+    WHERE simulacao_id = :simulacao_id AND usuario_id = :usuario_id AND ativo = 'T'
+    """
+    simulacao_ids = list(dict.fromkeys(int(simulacao_id) for simulacao_id in simulacao_ids))
+    inativadas = []
+
+    backend_atual = obter_backend()
+    with obter_conexao() as conn, closing(conn.cursor()) as cursor:
+        for inicio in range(0, len(simulacao_ids), tamanho_lote):
+            lote = simulacao_ids[inicio:inicio + tamanho_lote]
+            linhas = [{'simulacao_id': simulacao_id, 'usuario_id': usuario_id} for simulacao_id in lote]
+            try:
+                contagens = backend_atual.executar_em_lote_contando(cursor, query, linhas)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            inativadas.extend(simulacao_id for simulacao_id, contagem in zip(lote, contagens) if contagem)
+
+    if inativadas:
+        invalidar_resultados(usuario_id, inativadas)
+    return inativadas
+
 def deletar_simulacao(simulacao_id, usuario_id_logado):
     try:
-        # Consultar a simulação no banco de dados
-        print(f"Consultando simulação com ID {simulacao_id}...")
-        query = "SELECT usuario_id FROM simulacoes WHERE simulacao_id = :simulacao_id"
-        cursor.execute(query, {'simulacao_id': simulacao_id})
-        simulacao = cursor.fetchone()
-
-        if simulacao is None:
-            print(f"Simulação com ID {simulacao_id} não encontrada.")
-            return
-
-        # Verificar se a simulação pertence ao usuário logado
-        if simulacao[0] != usuario_id_logado:  # Aqui estamos acessando o primeiro valor da tupla
-            print("Você não tem permissão para inativar esta simulação.")
-            return
+        # Um único UPDATE confere a posse e inativa a simulação (sem SELECT prévio)
+        if inativar_simulacoes(usuario_id_logado, [simulacao_id]):
+            print(f"Simulação {simulacao_id} excluida com sucesso.")
+        else:
+            print(f"Simulação com ID {simulacao_id} não encontrada ou sem permissão para inativá-la.")
 
-        # Se o usuário tem permissão, marcar a simulação como inativa
-        query = """
-        UPDATE simulacoes
-        SET ativo = 'F'
-        WHERE simulacao_id = :simulacao_id
-        """
-        
-        cursor.execute(query, {'simulacao_id': simulacao_id})
-        conn.commit()
-        print(f"Simulação {simulacao_id} excluida com sucesso.")
-    
     except Exception as e:
         print(f"Erro ao tentar inativar simulação: {e}")
 
 def editar_simulacao(simulacao_id, usuario_id_logado):
     try:
-        # Consultar a simulação no banco de dados para verificar a propriedade
-        print(f"Consultando simulação com ID {simulacao_id}...")
-        query = "SELECT usuario_id FROM simulacoes WHERE simulacao_id = :simulacao_id AND ativo = 'T'"
-        cursor.execute(query, {'simulacao_id': simulacao_id})
-        simulacao = cursor.fetchone()
-
-        if simulacao is None:
-            print(f"Simulação com ID {simulacao_id} não encontrada.")
-            return
-
-        print(f"Simulação encontrada: {simulacao}")
-
-        # Verificar se a simulação pertence ao usuário logado
-        if simulacao[0] != usuario_id_logado:  # A coluna 'usuario_id' está no índice 10
-            print("Você não tem permissão para alterar esta simulação.")
-            return
-
-        # Receber novos dados para atualização
+        # Receber novos dados para atualização (a posse é conferida no próprio UPDATE)
         limpar_tela()
 
         nome = input("Novo nome da simulação: ")
@@ -284,69 +1744,391 @@ def editar_simulacao(simulacao_id, usuario_id_logado):
             orcamento = input("Novo orçamento disponível: R$ ")
         orcamento = float(orcamento)
 
-        # Atualizar os dados no banco de dados
-        query = """
-        UPDATE simulacoes
-        SET nome = :nome, tamanho_disp = :tamanho_disp, estado = :estado, 
-            consumo = :consumo, orcamento = :orcamento
-        WHERE simulacao_id = :simulacao_id
-        """
-        cursor.execute(query, {
+        # Recalcular os resultados armazenados com o mesmo modelo de 'criar_simulacao'
+        resultado = calcular_simulacoes(tamanho_disp, consumo, orcamento, estado)
+        custo_investimento = float(resultado['custo_investimento'])
+        economia_anual = float(resultado['economia_anual'])
+
+        # Atualizar dados e resultados em um único UPDATE ... RETURNING, só se a simulação
+        # estiver ativa e pertencer ao usuário logado
+        query = consulta_editar_simulacao
+        valores = {
             'nome': nome,
             'tamanho_disp': tamanho_disp,
             'estado': estado,
             'consumo': consumo,
             'orcamento': orcamento,
-            'simulacao_id': simulacao_id
-        })
-        conn.commit()
+            'custo_investimento': custo_investimento,
+            'economia_anual': economia_anual,
+        }
+        with obter_conexao() as conn, closing(conn.cursor()) as cursor:
+            retorno = obter_backend().executar_retornando(
+                cursor, query, {**valores, 'simulacao_id': simulacao_id, 'usuario_id': usuario_id_logado},
+                ['custo_investimento', 'economia_anual']
+            )
+            conn.commit()
+
+        if retorno is None:
+            print(f"Simulação com ID {simulacao_id} não encontrada ou sem permissão para alterá-la.")
+            return
+
+        cache_resultados.atualizar_simulacao(usuario_id_logado, simulacao_id, valores)
 
         print(f"Simulação atualizada com sucesso.")
+        print(f"Custo do investimento: R${retorno[0]:.2f} | Economia anual: R${retorno[1]:.2f}")
 
     except Exception as e:
         print(f"Erro ao tentar atualizar simulação: {e}")
 
+def editar_simulacoes_em_lote(usuario_id, simulacao_ids, nomes, tamanho_disp, estado, consumo, orcamento, tamanho_lote=1000):
+    """
+    Edita várias simulações do usuário em uma única chamada, sem prints nem input(): recalcula
+    os resultados de todas de forma vetorizada e grava com um executemany por lote. A posse é
+    conferida no próprio UPDATE.
+
+    Parâmetros:
+    usuario_id (int): ID do usuário dono das simulações.
+    simulacao_ids (array-like): IDs das simulações a editar.
+    nomes, tamanho_disp, estado, consumo, orcamento (array-like): Novos dados de cada simulação.
+    tamanho_lote (int): Linhas enviadas por executemany/commit.
+
+    Retorna:
+    pd.DataFrame: Novos dados e resultados de cada simulação, com as colunas 'valida' e
+    'atualizada' (False para entradas inválidas e IDs de outros usuários, inexistentes ou inativos).
+    """
+    import numpy as np
+    import pandas as pd
+
+    resultado = calcular_simulacoes(tamanho_disp, consumo, orcamento, estado)
+    df = pd.DataFrame({
+        'simulacao_id': np.asarray(simulacao_ids, dtype=np.int64),
+        'nome': np.asarray(nomes, dtype=object),
+        'tamanho_disp': np.asarray(tamanho_disp, dtype=float),
+        'estado': np.asarray(estado, dtype=object),
+        'consumo': np.asarray(consumo, dtype=float),
+        'orcamento': np.asarray(orcamento, dtype=float),
+        **resultado,
+    })
+    df['atualizada'] = False
+
+    colunas = ['simulacao_id', 'nome', 'tamanho_disp', 'estado', 'consumo', 'orcamento', 'custo_investimento', 'economia_anual']
+    validas = df[df['valida']]
+    backend_atual = obter_backend()
+    with obter_conexao() as conn, closing(conn.cursor()) as cursor:
+        for inicio in range(0, len(validas), tamanho_lote):
+            lote = validas.iloc[inicio:inicio + tamanho_lote]
+            linhas = lote[colunas].assign(usuario_id=usuario_id).to_dict('records')
+            try:
+                contagens = backend_atual.executar_em_lote_contando(cursor, consulta_editar_simulacao, linhas)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            df.loc[lote.index, 'atualizada'] = np.asarray(contagens) > 0
+
+    if df['atualizada'].any():
+        invalidar_resultados(usuario_id)
+    return df
+
 
 # =========================================================================================
 # Funções de Cálculo
 # =========================================================================================
 def calcular_economias(simulacao_data):
-    df = pd.DataFrame(simulacao_data)
-    
-    # Calcular o tempo para lucro (em anos), usando a economia anual diretamente
-    df['tempo_para_lucro_anos'] = df.apply(
-        lambda row: calcular_tempo_para_lucro(row['custo_investimento'], row['economia_anual']), 
-        axis=1
-    )
-    
-    # Calcular a economia mensal: dividindo a economia anual por 12
-    df['economia_mensal_R$'] = df['economia_anual'] / 12
-    
-    # Calcular a redução de carbono (em kg): assume que cada kWh reduz 0.2 kg de CO₂
-    df['reducao_carbono_KG'] = df['consumo'] * 0.2
-    
-    # Adicionar uma coluna de 'rentabilidade' para indicar o retorno do investimento (se desejado)
-    df['rentabilidade'] = (df['economia_anual'] / df['custo_investimento']) * 100  # Rentabilidade em %
-    
-    # Validar se há algum valor negativo ou zero em variáveis críticas (evitar erros em cálculos)
-    df['tempo_para_lucro_anos'] = df['tempo_para_lucro_anos'].apply(lambda x: max(x, 0) if pd.notnull(x) else 0)
-    df['economia_mensal_R$'] = df['economia_mensal_R$'].apply(lambda x: max(x, 0) if pd.notnull(x) else 0)
-    df['reducao_carbono_KG'] = df['reducao_carbono_KG'].apply(lambda x: max(x, 0) if pd.notnull(x) else 0)
+    """
+    Calcula os resultados econômicos de todas as simulações em uma única passada vetorizada.
 
+    Parâmetros:
+    simulacao_data (pd.DataFrame | dict | SimulacoesCompactas): Dados das simulações com as colunas
+    'custo_investimento', 'economia_anual' e 'consumo'. Um SimulacoesCompactas é retornado
+    como SimulacoesCompactas (sem passar por DataFrame).
+    """
+    import numpy as np
+    import pandas as pd
+
+    compactas = isinstance(simulacao_data, SimulacoesCompactas)
+    df = simulacao_data if compactas else pd.DataFrame(simulacao_data)
+
+    custo_investimento = np.asarray(df['custo_investimento'], dtype=float)
+    economia_anual = np.asarray(df['economia_anual'], dtype=float)
+    consumo = np.asarray(df['consumo'], dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Tempo para lucro (em anos); sem economia anual o payback fica indefinido (NaN)
+        tempo_para_lucro = np.where(economia_anual > 0, np.round(custo_investimento / economia_anual, 2), np.nan)
+
+        # Rentabilidade em % (retorno anual sobre o investimento)
+        rentabilidade = np.where(custo_investimento != 0, economia_anual / custo_investimento * 100, np.nan)
+
+    # Economia mensal: economia anual dividida por 12
+    economia_mensal = economia_anual / 12
+
+    # Redução de carbono (em kg): assume que cada kWh reduz 0.2 kg de CO₂
+    reducao_carbono = consumo * 0.2
+
+    # Validar se há algum valor negativo ou nulo em variáveis críticas (evitar erros em cálculos).
+    # O tempo para lucro indefinido continua NaN: 0 seria lido como "se paga imediatamente"
+    resultados = {
+        'tempo_para_lucro_anos': np.maximum(tempo_para_lucro, 0),
+        'economia_mensal_R$': np.maximum(np.nan_to_num(economia_mensal, nan=0.0), 0),
+        'reducao_carbono_KG': np.maximum(np.nan_to_num(reducao_carbono, nan=0.0), 0),
+        'rentabilidade': rentabilidade,
+    }
+    if compactas:
+        return df.com_colunas(**resultados)
+
+    for coluna, valores in resultados.items():
+        df[coluna] = valores
     return df
 
 def calcular_tempo_para_lucro(custo_investimento, economia_anual):
     """
-    Calcula o tempo necessário para que a economia anual ultrapasse o custo do investimento,
-    sem considerar o orçamento, apenas com o acúmulo da economia anual.
+    Calcula o tempo necessário para que a economia anual ultrapasse o custo do investimento,
+    sem considerar o orçamento, apenas com o acúmulo da economia anual.
+    Retorna NaN quando não há economia anual (payback indefinido).
+    """
+    if not economia_anual or economia_anual <= 0:
+        return float('nan')
+
+    # Calcular o tempo para lucro em anos, dividindo o custo de investimento pela economia anual
+    tempo_anos = custo_investimento / economia_anual
+    return round(tempo_anos, 2)
+
+def gerar_aviso(df):
+    return df[colunas_resultados]
+
+
+# =========================================================================================
+# Análise de Risco (Monte Carlo)
+# =========================================================================================
+# Incertezas consideradas em cada cenário sorteado
+premissas_monte_carlo = {
+    'irradiancia_desvio': 0.10,  # Desvio relativo da geração anual (irradiância), distribuição normal
+    'inflacao_media': 0.05,  # Reajuste anual médio da tarifa de energia
+    'inflacao_desvio': 0.02,  # Desvio do reajuste anual da tarifa
+    'degradacao_min': 0.003,  # Perda anual de eficiência dos painéis (mínima)
+    'degradacao_max': 0.008,  # Perda anual de eficiência dos painéis (máxima)
+    'custo_manutencao': 0.01,  # Operação e manutenção ao ano, em fração do investimento (como na projeção)
+    'anos_maximos': 50,  # Anos projetados em cada cenário; acima disso o payback é inf
+}
+
+def simular_bloco_monte_carlo(custo_investimento, geracao_anual, consumo_anual, preco_kwh, sorteios, semente, premissas):
+    """
+    Sorteia um bloco de cenários para cada simulação e retorna a matriz de paybacks
+    (simulações x sorteios). Executado nos processos de 'simular_monte_carlo'.
+
+    Cada cenário é projetado ano a ano como em 'projetar_fluxo_caixa': a geração sorteada
+    (irradiância e degradação) é limitada ao consumo anual antes de virar economia, então
+    sistemas que já cobrem todo o consumo não ganham com anos de sol acima da média.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(semente)
+    forma = (len(custo_investimento), sorteios)
+
+    irradiancia = np.maximum(rng.normal(1.0, premissas['irradiancia_desvio'], forma), 0)
+    inflacao = rng.normal(premissas['inflacao_media'], premissas['inflacao_desvio'], forma)
+    degradacao = rng.uniform(premissas['degradacao_min'], premissas['degradacao_max'], forma)
+
+    custo = custo_investimento[:, None]
+    geracao = geracao_anual[:, None] * irradiancia
+    tarifa = np.broadcast_to(preco_kwh[:, None], forma).copy()
+    manutencao = premissas['custo_manutencao'] * custo
+    saldo = np.broadcast_to(-custo, forma).copy()
+    payback = np.full(forma, np.inf)
+
+    # Um ano por iteração sobre todos os cenários do bloco; termina quando todos se pagaram
+    for ano in range(premissas['anos_maximos']):
+        fluxo = np.minimum(consumo_anual[:, None], geracao) * tarifa - manutencao
+        novo_saldo = saldo + fluxo
+        pagou = np.isinf(payback) & (novo_saldo >= 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            payback[pagou] = ano + np.clip(np.nan_to_num(-saldo[pagou] / fluxo[pagou]), 0, 1)
+        if not np.isinf(payback).any():
+            break
+        saldo = novo_saldo
+        geracao *= 1 - degradacao
+        tarifa *= 1 + inflacao
+    return payback.astype(np.float32)
+
+def simular_monte_carlo(tamanho_disp, consumo, estado=None, cenarios=10_000, semente=42, processos=None,
+                        tamanho_bloco=1_000_000, horizonte_anos=25, premissas=None,
+                        custo_por_m2=1000, producao_por_m2=None, preco_kwh=0.50):
+    """
+    Distribuição do payback de cada simulação sob incerteza de irradiância, reajuste da tarifa
+    e degradação dos painéis, sobre o mesmo modelo de 'calcular_simulacoes' e
+    'projetar_fluxo_caixa' (economia = min(consumo, geração) x tarifa, menos a manutenção).
+
+    Os cenários são divididos em blocos de até 'tamanho_bloco' sorteios (simulações x cenários),
+    calculados em paralelo em um ProcessPoolExecutor. Cada bloco recebe uma semente derivada de
+    'semente' (SeedSequence.spawn), então o resultado é o mesmo para qualquer número de processos.
+
+    Parâmetros:
+    tamanho_disp, consumo, estado (array-like): Entradas de cada simulação da carteira (como em 'calcular_simulacoes').
+    cenarios (int): Cenários sorteados por simulação.
+    semente (int): Semente para resultados reproduzíveis.
+    processos (int): Quantidade de processos (padrão: todos os núcleos; 1 executa no processo atual).
+    tamanho_bloco (int): Sorteios por bloco de trabalho.
+    horizonte_anos (int): Horizonte usado na probabilidade de retorno do investimento.
+    premissas (dict): Substitui valores de 'premissas_monte_carlo'.
+    custo_por_m2, producao_por_m2, preco_kwh: Parâmetros do modelo (ver 'calcular_simulacoes').
+
+    Retorna:
+    pd.DataFrame: Por simulação, 'payback_p10', 'payback_p50', 'payback_p90' (anos; inf quando
+    o investimento não se paga em 'anos_maximos') e 'prob_payback_horizonte'. Vazio para uma
+    carteira vazia.
+    """
+    import numpy as np
+    import pandas as pd
+    from concurrent.futures import ProcessPoolExecutor
+
+    premissas = {**premissas_monte_carlo, **(premissas or {})}
+    base = calcular_simulacoes(tamanho_disp, consumo, 1, estado, custo_por_m2, producao_por_m2, preco_kwh)
+    custo_investimento, geracao_anual, consumo_anual, preco_kwh = (np.ascontiguousarray(valores, dtype=float) for valores in np.broadcast_arrays(
+        np.atleast_1d(base['custo_investimento']),
+        np.atleast_1d(base['energia_gerada_anual']),
+        np.atleast_1d(np.asarray(consumo, dtype=float) * 12),
+        np.atleast_1d(np.asarray(preco_kwh, dtype=float)),
+    ))
+    if len(custo_investimento) == 0:
+        return pd.DataFrame({coluna: np.empty(0) for coluna in ['payback_p10', 'payback_p50', 'payback_p90', 'prob_payback_horizonte']})
+
+    sorteios_por_bloco = max(1, tamanho_bloco // len(custo_investimento))
+    blocos = [min(sorteios_por_bloco, cenarios - inicio) for inicio in range(0, cenarios, sorteios_por_bloco)]
+    sementes = np.random.SeedSequence(semente).spawn(len(blocos))
+    argumentos = [(custo_investimento, geracao_anual, consumo_anual, preco_kwh, sorteios, semente_bloco, premissas)
+                  for sorteios, semente_bloco in zip(blocos, sementes)]
+
+    if processos == 1 or len(blocos) == 1:
+        paybacks = [simular_bloco_monte_carlo(*args) for args in argumentos]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            paybacks = list(executor.map(simular_bloco_monte_carlo, *zip(*argumentos)))
+    paybacks = np.concatenate(paybacks, axis=1)
+
+    # 'inverted_cdf' não interpola, evitando NaN entre paybacks finitos e infinitos
+    p10, p50, p90 = np.quantile(paybacks, [0.10, 0.50, 0.90], axis=1, method='inverted_cdf')
+    return pd.DataFrame({
+        'payback_p10': p10,
+        'payback_p50': p50,
+        'payback_p90': p90,
+        'prob_payback_horizonte': (paybacks <= horizonte_anos).mean(axis=1),
+    })
+
+# =========================================================================================
+# Projeção de Fluxo de Caixa
+# =========================================================================================
+premissas_fluxo_caixa = {
+    'anos': 25,  # Horizonte da projeção (vida útil dos painéis)
+    'taxa_desconto': 0.08,  # Taxa mínima de atratividade ao ano, usada no VPL e no payback descontado
+    'reajuste_tarifa': 0.05,  # Reajuste anual da tarifa de energia
+    'degradacao': 0.005,  # Perda anual de geração dos painéis
+    'custo_manutencao': 0.01,  # Operação e manutenção ao ano, em fração do investimento
+}
+
+def calcular_payback_projetado(saldo_acumulado, fluxo):
+    """
+    Primeiro ano (com fração, por interpolação dentro do ano) em que o saldo acumulado fica
+    positivo, para cada linha da matriz (simulações x anos). inf quando não se paga no horizonte.
+    """
+    import numpy as np
+
+    atingiu = saldo_acumulado >= 0
+    ano = atingiu.argmax(axis=1)
+    linhas = np.arange(len(saldo_acumulado))
+    fluxo_ano = fluxo[linhas, ano]
+    saldo_anterior = saldo_acumulado[linhas, ano] - fluxo_ano
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        payback = ano + np.clip(-saldo_anterior / fluxo_ano, 0, 1)
+    return np.where(atingiu.any(axis=1), payback, np.inf)
+
+def calcular_tir(custo_investimento, fluxo, iteracoes=60, taxa_min=-0.99, taxa_max=10.0):
+    """
+    Taxa interna de retorno de cada simulação por bisseção vetorizada (todas as simulações a
+    cada iteração). NaN quando o VPL não troca de sinal no intervalo de taxas.
+    """
+    import numpy as np
+
+    # Esquema de Horner em v = 1 / (1 + taxa): uma multiplicação-soma por ano sobre vetores
+    colunas = list(fluxo.T[::-1])
+
+    def vpl(taxa):
+        v = 1 / (1 + taxa)
+        total = np.zeros_like(v)
+        for coluna in colunas:
+            total = (total + coluna) * v
+        return total - custo_investimento
+
+    baixa = np.full(len(fluxo), taxa_min)
+    alta = np.full(len(fluxo), taxa_max)
+    vpl_baixa = vpl(baixa)
+    existe = np.sign(vpl_baixa) != np.sign(vpl(alta))
+
+    for _ in range(iteracoes):
+        meio = (baixa + alta) / 2
+        vpl_meio = vpl(meio)
+        mesmo_sinal = np.sign(vpl_meio) == np.sign(vpl_baixa)
+        baixa = np.where(mesmo_sinal, meio, baixa)
+        vpl_baixa = np.where(mesmo_sinal, vpl_meio, vpl_baixa)
+        alta = np.where(mesmo_sinal, alta, meio)
+
+    return np.where(existe, (baixa + alta) / 2, np.nan)
+
+def projetar_fluxo_caixa(tamanho_disp, consumo, estado=None, custo_por_m2=1000, producao_por_m2=None, preco_kwh=0.50, **premissas):
     """
-    # Calcular o tempo para lucro em anos, dividindo o custo de investimento pela economia anual
-    tempo_anos = custo_investimento / economia_anual
-    return round(tempo_anos, 2)
+    Projeção ano a ano do fluxo de caixa de cada simulação, com degradação dos painéis e
+    reajuste da tarifa, calculada como matrizes (simulações x anos) sem laços em Python.
 
-def gerar_aviso(df):
-    return df[['simulacao_id', 'custo_investimento', 'economia_anual', 'tempo_para_lucro_anos', 'economia_mensal_R$', 'reducao_carbono_KG']]
+    Parâmetros:
+    tamanho_disp, consumo, estado (array-like): Entradas de cada simulação (como em 'calcular_simulacoes').
+    custo_por_m2, producao_por_m2, preco_kwh: Parâmetros do modelo (ver 'calcular_simulacoes').
+    premissas: Substitui valores de 'premissas_fluxo_caixa' (ex.: anos=30, taxa_desconto=0.1).
+
+    Retorna:
+    dict: 'anos', 'fluxo_caixa' e 'saldo_acumulado' (matrizes simulações x anos) e 'resumo'
+    (pd.DataFrame com 'vpl', 'tir', 'payback_anos', 'payback_descontado_anos',
+    'economia_acumulada' e 'saldo_final' de cada simulação).
+    """
+    import numpy as np
+    import pandas as pd
+
+    premissas = {**premissas_fluxo_caixa, **premissas}
+    base = calcular_simulacoes(tamanho_disp, consumo, 1, estado, custo_por_m2, producao_por_m2, preco_kwh)
+    custo, geracao, consumo_anual = np.broadcast_arrays(
+        np.atleast_1d(base['custo_investimento']),
+        np.atleast_1d(base['energia_gerada_anual']),
+        np.atleast_1d(np.asarray(consumo, dtype=float) * 12),
+    )
 
+    anos = np.arange(1, premissas['anos'] + 1)
+    geracao_ano = geracao[:, None] * (1 - premissas['degradacao']) ** (anos - 1)
+    tarifa_ano = preco_kwh * (1 + premissas['reajuste_tarifa']) ** (anos - 1)
+    economia_ano = np.minimum(consumo_anual[:, None], geracao_ano) * tarifa_ano
+    fluxo = economia_ano - premissas['custo_manutencao'] * custo[:, None]
+
+    fluxo_descontado = fluxo * (1 + premissas['taxa_desconto']) ** -anos
+    saldo_acumulado = np.cumsum(fluxo, axis=1) - custo[:, None]
+    saldo_descontado = np.cumsum(fluxo_descontado, axis=1) - custo[:, None]
+
+    resumo = pd.DataFrame({
+        'vpl': saldo_descontado[:, -1],
+        'tir': calcular_tir(custo, fluxo),
+        'payback_anos': calcular_payback_projetado(saldo_acumulado, fluxo),
+        'payback_descontado_anos': calcular_payback_projetado(saldo_descontado, fluxo_descontado),
+        'economia_acumulada': economia_ano.sum(axis=1),
+        'saldo_final': saldo_acumulado[:, -1],
+    })
+    return {'anos': anos, 'fluxo_caixa': fluxo, 'saldo_acumulado': saldo_acumulado, 'resumo': resumo}
+
+def gerar_projecao(df):
+    """
+    Resumo da projeção de fluxo de caixa para as simulações de um DataFrame (ex.: 'obter_economias').
+    """
+    projecao = projetar_fluxo_caixa(df['tamanho_disp'], df['consumo'], df['estado'])['resumo']
+    return projecao.round(2).assign(tir=projecao['tir'].round(4)).set_axis(df.index).assign(
+        simulacao_id=df['simulacao_id'], nome=df['nome']
+    )[['simulacao_id', 'nome', *projecao.columns]]
 
 # =========================================================================================
 # Funções de Exibição e Consultas
@@ -356,7 +2138,7 @@ def listar_colunas_linhas(usuario_id):
     Função para listar as colunas e linhas dos dados fornecidos pelo usuário
     e aplicar filtros nas consultas.
     """
-    os.system("cls")
+    limpar_tela()
     print(""" 
 --------------------------------      
 Escolha a/as coluna/as          
@@ -524,85 +2306,337 @@ para serem exibidas:
                     listar_dados(usuario_id, 'orcamento', (float(orcamento), float(orcamento2)), condicao='BETWEEN', coluna_retorno=colunas_filtro)
                     input("Pressione Enter...")
 
-def listar_todos_dados(usuario_id):
-    # Inicia a query para selecionar todos os dados de simulações
+@lru_cache(maxsize=8)
+def montar_consulta_pagina(anterior=False, dialeto='oracle'):
+    """
+    SELECT de uma página de simulações por keyset (simulacao_id), que usa o índice
+    (usuario_id, ativo, simulacao_id) e custa o mesmo em qualquer página.
+    """
     query = "SELECT * FROM simulacoes WHERE usuario_id = :usuario_id AND ativo = 'T'"
-    params = {'usuario_id': usuario_id}
-    
-    # Executa a consulta no banco de dados
-    cursor.execute(query, params)
-    
-    # Obtém os dados e as colunas
-    data = cursor.fetchall()
-    colunas = [desc[0] for desc in cursor.description]
-    
-    # Cria um DataFrame a partir dos dados recuperados
-    df = pd.DataFrame(data, columns=colunas)
-    
+    if anterior:
+        query += " AND simulacao_id < :referencia ORDER BY simulacao_id DESC"
+    else:
+        query += " AND simulacao_id > :referencia ORDER BY simulacao_id"
+    if dialeto == 'sqlite':
+        return query + " LIMIT :limite"
+    return query + " FETCH FIRST :limite ROWS ONLY"
+
+def consultar_pagina_simulacoes(usuario_id, tamanho_pagina=20, apos_id=0, antes_id=None):
+    """
+    Busca uma página de simulações ativas do usuário, paginando por simulacao_id (keyset).
+
+    Parâmetros:
+    usuario_id (int): ID do usuário.
+    tamanho_pagina (int): Quantidade de simulações por página.
+    apos_id (int): Próxima página: simulações com ID maior que este (padrão: primeira página).
+    antes_id (int): Página anterior: simulações com ID menor que este (tem prioridade sobre apos_id).
+
+    Retorna:
+    tuple: (pd.DataFrame da página em ordem crescente de ID, bool indicando se há mais
+    simulações na direção consultada).
+    """
+    import pandas as pd
+
+    anterior = antes_id is not None
+    query = montar_consulta_pagina(anterior, obter_backend().nome)
+    params = {'usuario_id': usuario_id, 'referencia': antes_id if anterior else apos_id, 'limite': tamanho_pagina + 1}
+
+    with obter_conexao() as conn, closing(conn.cursor()) as cursor:
+        obter_backend().ajustar_cursor(cursor, tamanho_pagina + 1)
+        cursor.execute(query, params)
+        linhas = cursor.fetchmany(tamanho_pagina + 1)
+        colunas = [desc[0] for desc in cursor.description]
+
+    ha_mais = len(linhas) > tamanho_pagina
+    linhas = linhas[:tamanho_pagina]
+    if anterior:
+        linhas.reverse()
+    return pd.DataFrame(linhas, columns=colunas), ha_mais
+
+def listar_todos_dados(usuario_id, tamanho_pagina=20):
+    """
+    Exibe as simulações do usuário uma página por vez, navegando com N (próxima) e P (anterior).
+    """
+    df, ha_proxima = consultar_pagina_simulacoes(usuario_id, tamanho_pagina)
+    ha_anterior = False
+
     # Exibe a lista de simulações, ou uma mensagem caso não haja dados
     if df.empty:
         print("Nenhum dado encontrado.")
-    else:
-        print(df)
+        return
 
-def listar_dados(usuario_id, coluna=None, valor=None, condicao=None, coluna_retorno=None):
-    # Inicia a query com o filtro pelo usuario_id
-    query = "SELECT * FROM simulacoes WHERE usuario_id = :usuario_id AND ativo = 'T'"
-    params = {'usuario_id': usuario_id}
+    pagina = 1
+    while True:
+        print(df.to_string(index=False))
+        print(f"\nPágina {pagina}")
+
+        opcoes = (["Próxima(N)"] if ha_proxima else []) + (["Anterior(P)"] if ha_anterior else [])
+        if not opcoes:
+            return
+        navegacao = input(f"{' '.join(opcoes)} Continuar(Enter): ").upper()
+
+        ids = df.iloc[:, 0]
+        if navegacao == 'N' and ha_proxima:
+            df, ha_proxima = consultar_pagina_simulacoes(usuario_id, tamanho_pagina, apos_id=int(ids.iloc[-1]))
+            ha_anterior = True
+            pagina += 1
+        elif navegacao == 'P' and ha_anterior:
+            df, ha_anterior = consultar_pagina_simulacoes(usuario_id, tamanho_pagina, antes_id=int(ids.iloc[0]))
+            ha_proxima = True
+            pagina -= 1
+        elif navegacao == '':
+            return
+        else:
+            print("Opção inválida! Tente novamente.")
+
+# Colunas que podem ser exibidas, filtradas e usadas na ordenação de 'listar_dados'
+colunas_consultaveis = ['simulacao_id', 'nome', 'tamanho_disp', 'estado', 'consumo', 'orcamento', 'custo_investimento', 'economia_anual', 'data']
+colunas_filtraveis = ['nome', 'estado', 'tamanho_disp', 'consumo', 'orcamento', 'custo_investimento', 'economia_anual']
+condicoes_filtro = {
+    'LIKE': "{coluna} LIKE :valor",
+    'BETWEEN': "{coluna} BETWEEN :inicio AND :fim",
+    '>': "{coluna} > :valor",
+    '<': "{coluna} < :valor",
+    '=': "{coluna} = :valor",
+}
+
+@lru_cache(maxsize=128)
+def montar_consulta_simulacoes(colunas=None, coluna_filtro=None, condicao=None, ordenar_por=None, decrescente=False, paginar=False, dialeto='oracle'):
+    """
+    Monta o SELECT de simulações do usuário a partir de listas de colunas permitidas. Os valores
+    são sempre passados como bind variables, então o mesmo texto de SQL é reaproveitado (e
+    encontrado no cache de statements do Oracle) para quaisquer valores e páginas.
 
-    # Aplica outros filtros se forem passados como argumentos
-    if coluna and valor:
-        if condicao == 'LIKE':
-            query += f" AND {coluna} LIKE :valor"
-            params['valor'] = f"%{valor}%"
-        elif condicao == 'BETWEEN':
-            query += f" AND {coluna} BETWEEN :inicio AND :fim"
-            params['inicio'], params['fim'] = valor
-        elif condicao == '>':
-            query += f" AND {coluna} > :valor"
-            params['valor'] = valor
-        elif condicao == '<':
-            query += f" AND {coluna} < :valor"
-            params['valor'] = valor
+    Parâmetros:
+    colunas (tuple): Colunas retornadas (padrão: todas as de 'colunas_simulacoes').
+    coluna_filtro (str): Coluna de 'colunas_filtraveis' usada no filtro.
+    condicao (str): Chave de 'condicoes_filtro' (padrão: '=').
+    ordenar_por (str): Coluna de 'colunas_consultaveis' usada na ordenação.
+    decrescente (bool): Ordena de forma decrescente.
+    paginar (bool): Adiciona a paginação com as binds :limite e :deslocamento.
+    dialeto (str): 'oracle' (OFFSET/FETCH) ou 'sqlite' (LIMIT/OFFSET).
+    """
+    colunas = colunas or tuple(colunas_simulacoes)
+    invalidas = [coluna for coluna in colunas if coluna not in colunas_simulacoes]
+    if invalidas:
+        raise ValueError(f"Colunas inválidas: {invalidas}")
+
+    query = f"SELECT {', '.join(coluna.upper() for coluna in colunas)} FROM simulacoes WHERE usuario_id = :usuario_id AND ativo = 'T'"
+
+    if coluna_filtro:
+        if coluna_filtro not in colunas_filtraveis:
+            raise ValueError(f"Coluna de filtro inválida: {coluna_filtro}")
+        if (condicao or '=') not in condicoes_filtro:
+            raise ValueError(f"Condição inválida: {condicao}")
+        query += " AND " + condicoes_filtro[condicao or '='].format(coluna=coluna_filtro)
+
+    if ordenar_por:
+        if ordenar_por not in colunas_consultaveis:
+            raise ValueError(f"Coluna de ordenação inválida: {ordenar_por}")
+        query += f" ORDER BY {ordenar_por}{' DESC' if decrescente else ''}"
+
+    if paginar:
+        if dialeto == 'sqlite':
+            query += " LIMIT :limite OFFSET :deslocamento"
         else:
-            query += f" AND {coluna} = :valor"
-            params['valor'] = valor
+            query += " OFFSET :deslocamento ROWS FETCH NEXT :limite ROWS ONLY"
+
+    return query
 
-    cursor.execute(query, params)
-    data = cursor.fetchall()
-    colunas = [desc[0] for desc in cursor.description]
+def listar_dados(usuario_id, coluna=None, valor=None, condicao=None, coluna_retorno=None, ordenar_por=None, decrescente=False, limite=None, deslocamento=0, exibir=True):
+    """
+    Lista as simulações do usuário aplicando no banco a projeção de colunas, o filtro,
+    a ordenação e a paginação (limite/deslocamento). Com exibir=False, apenas retorna o DataFrame.
+    """
+    import pandas as pd
+
+    query, params = preparar_listagem(usuario_id, coluna, valor, condicao, coluna_retorno, ordenar_por, decrescente, limite, deslocamento)
+    with obter_conexao() as conn, closing(conn.cursor()) as cursor:
+        cursor.execute(query, params)
+        data = cursor.fetchall()
+        # O banco devolve os nomes em maiúsculas; em minúsculas, como em 'colunas_simulacoes'
+        colunas = [desc[0].lower() for desc in cursor.description]
     df = pd.DataFrame(data, columns=colunas)
 
+    if exibir:
+        print("Nenhum dado encontrado." if df.empty else df)
+    return df
+
+def preparar_listagem(usuario_id, coluna=None, valor=None, condicao=None, coluna_retorno=None, ordenar_por=None, decrescente=False, limite=None, deslocamento=0):
+    """
+    Monta o SELECT e as binds de 'listar_dados' (compartilhado com 'listar_dados_async').
+
+    Retorna:
+    tuple: (query, params).
+    """
+    # Projeção: apenas as colunas escolhidas (na ordem informada) saem do banco
+    colunas = None
     if coluna_retorno:
-        coluna_retorno = [col for col in coluna_retorno if col in df.columns]
-        df = df[coluna_retorno]
+        colunas = tuple(dict.fromkeys(col.lower() for col in coluna_retorno if col.lower() in colunas_simulacoes)) or None
+
+    params = {'usuario_id': usuario_id}
+
+    # Aplica outros filtros se forem passados como argumentos. Valores "falsos" (0, '') também
+    # filtram: só a ausência do valor (None) dispensa o filtro
+    if not coluna:
+        if valor is not None or condicao is not None:
+            raise ValueError("Informe a coluna do filtro junto com o valor e a condição.")
+        coluna = None
+    elif valor is None:
+        if condicao is not None:
+            raise ValueError(f"Informe o valor do filtro para a coluna {coluna}.")
+        coluna = None
+    elif condicao == 'LIKE':
+        params['valor'] = f"%{valor}%"
+    elif condicao == 'BETWEEN':
+        params['inicio'], params['fim'] = valor
+    else:
+        params['valor'] = valor
 
-    print("Nenhum dado encontrado." if df.empty else df)
+    paginar = limite is not None
+    if paginar:
+        params['limite'], params['deslocamento'] = limite, deslocamento
+        # Paginação estável: sem ordenação explícita, ordena pelo ID
+        ordenar_por = ordenar_por or 'simulacao_id'
 
-def acessar_economias(df):
-    plt.figure(figsize=(10, 6))
-    
-    # Gráfico único: Tempo para começar a gerar lucro em anos
-    plt.barh(df['nome'], df['tempo_para_lucro_anos'], color='lightcoral', edgecolor='black')
-    plt.title('Tempo para Começar a Gerar Lucro (em Anos)', fontsize=14)
-    plt.xlabel('Tempo para Lucro (anos)', fontsize=12)
-    plt.ylabel('Simulações', fontsize=12)
+    query = montar_consulta_simulacoes(
+        colunas, coluna.lower() if coluna else None, condicao, ordenar_por, decrescente, paginar, obter_backend().nome
+    )
+    return query, params
+
+def desenhar_grafico_economias(df, max_barras=30, faixas=30, figura=None):
+    """
+    Desenha o tempo para lucro das simulações em uma figura do matplotlib, sem pyplot (não
+    depende de janela e pode rodar fora da thread principal).
+
+    Até 'max_barras' simulações, desenha uma barra por simulação. Acima disso, desenha as
+    'max_barras' simulações com menor payback e o histograma do payback de todas elas.
 
-    plt.tight_layout()
-    plt.show()
+    Parâmetros:
+    df (pd.DataFrame | SimulacoesCompactas): Saída de 'calcular_economias'.
+    max_barras (int): Quantidade máxima de barras individuais.
+    faixas (int): Quantidade de faixas do histograma.
+    figura (matplotlib.figure.Figure): Figura a usar (padrão: uma nova, 10 x 6 polegadas).
+
+    Retorna:
+    matplotlib.figure.Figure: A figura desenhada.
+    """
+    import numpy as np
+    from matplotlib.figure import Figure
+
+    nomes = np.asarray(df['nome'], dtype=object)
+    payback = np.asarray(df['tempo_para_lucro_anos'], dtype=float)
+    figura = figura if figura is not None else Figure(figsize=(10, 6))
+
+    if len(payback) <= max_barras:
+        eixo_barras = figura.subplots()
+        selecao = np.arange(len(payback))
+        titulo = 'Tempo para Começar a Gerar Lucro (em Anos)'
+    else:
+        eixo_barras, eixo_histograma = figura.subplots(1, 2)
+        # Payback NaN indica simulação sem economia (payback indefinido): fica fora do top-N
+        definidos = np.flatnonzero(np.isfinite(payback))
+        selecao = definidos[np.argpartition(payback[definidos], max_barras - 1)[:max_barras]] if len(definidos) > max_barras else definidos
+        selecao = selecao[np.argsort(payback[selecao])[::-1]]
+        titulo = f'{len(selecao)} Simulações com Menor Payback'
+
+        # Faixas até o percentil 99, para que poucos paybacks muito longos não achatem o histograma
+        limite = np.percentile(payback[definidos], 99) if len(definidos) else 1
+        eixo_histograma.hist(payback[definidos], bins=faixas, range=(0, limite), color='lightcoral', edgecolor='black')
+        eixo_histograma.set_title(f'Payback de {len(payback)} Simulações', fontsize=14)
+        eixo_histograma.set_xlabel('Tempo para Lucro (anos)', fontsize=12)
+        eixo_histograma.set_ylabel('Simulações', fontsize=12)
+        # Apenas paybacks definidos acima do percentil 99 (os indefinidos não são desenhados)
+        fora = np.count_nonzero(payback[definidos] > limite)
+        if fora:
+            eixo_histograma.annotate(f'{fora} fora da escala',
+                                     xy=(0.98, 0.98), xycoords='axes fraction', ha='right', va='top', fontsize=9)
+
+    # Posições numéricas no eixo: nomes repetidos não são agrupados em uma única barra
+    posicoes = np.arange(len(selecao))
+    eixo_barras.barh(posicoes, payback[selecao], color='lightcoral', edgecolor='black')
+    eixo_barras.set_yticks(posicoes, nomes[selecao])
+    eixo_barras.set_title(titulo, fontsize=14)
+    eixo_barras.set_xlabel('Tempo para Lucro (anos)', fontsize=12)
+    eixo_barras.set_ylabel('Simulações', fontsize=12)
+
+    figura.tight_layout()
+    return figura
+
+def salvar_grafico_economias(df, destino='grafico_economias.png', formato=None, **opcoes):
+    """
+    Gera o gráfico de 'desenhar_grafico_economias' sem interface gráfica (Agg) e grava em disco
+    ou em um buffer em memória.
+
+    Parâmetros:
+    df (pd.DataFrame | SimulacoesCompactas): Saída de 'calcular_economias'.
+    destino (str | arquivo binário): Caminho do arquivo ou buffer (ex.: io.BytesIO()).
+    formato (str): 'png' ou 'svg' (padrão: deduzido pela extensão do arquivo; 'png' em buffers).
+    opcoes: Repassadas a 'desenhar_grafico_economias' (max_barras, faixas).
+
+    Retorna:
+    O próprio destino.
+    """
+    if formato is None:
+        formato = destino.rsplit('.', 1)[-1].lower() if isinstance(destino, str) and '.' in destino else 'png'
+    if formato not in ('png', 'svg'):
+        raise ValueError(f"Formato de gráfico não suportado: {formato} (use png ou svg)")
+
+    desenhar_grafico_economias(df, **opcoes).savefig(destino, format=formato, dpi=100)
+    return destino
+
+def acessar_economias(df, destino='grafico_economias.png', em_segundo_plano=True, **opcoes):
+    """
+    Gera o gráfico de tempo para lucro das simulações.
+
+    Parâmetros:
+    df (pd.DataFrame | SimulacoesCompactas): Saída de 'calcular_economias'.
+    destino (str | arquivo binário | None): Arquivo PNG/SVG ou buffer onde salvar o gráfico.
+    Com None, abre a janela interativa do matplotlib (bloqueia até ser fechada).
+    em_segundo_plano (bool): Gera o arquivo em uma thread, sem travar o menu (padrão: True).
+    opcoes: Repassadas a 'desenhar_grafico_economias' (max_barras, faixas).
+
+    Retorna:
+    concurrent.futures.Future com o destino quando em segundo plano; senão, o destino.
+    """
+    if destino is None:
+        import matplotlib.pyplot as plt
+
+        desenhar_grafico_economias(df, figura=plt.figure(figsize=(10, 6)), **opcoes)
+        plt.show()
+        return None
+
+    if not em_segundo_plano:
+        return salvar_grafico_economias(df, destino, **opcoes)
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    def gerar():
+        try:
+            return salvar_grafico_economias(df, destino, **opcoes)
+        except Exception as e:
+            print(f"Erro ao gerar gráfico: {e}")
+            raise
+
+    # A thread termina sozinha ao concluir o gráfico; o executor não precisa esperar por ela
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='grafico')
+    tarefa = executor.submit(gerar)
+    executor.shutdown(wait=False)
+    return tarefa
 
 def consultar_simulacoes(usuario_id):
+    import pandas as pd
+
     try:
-        query = "SELECT * FROM simulacoes WHERE usuario_id = :usuario_id AND ativo = 'T'"
-        cursor.execute(query, {'usuario_id': usuario_id})
-        simulacoes = cursor.fetchall()
-        if not simulacoes:
+        # Leitura em blocos (fetchmany) em vez de um único fetchall
+        blocos = list(consultar_simulacoes_em_blocos(usuario_id))
+        if not blocos:
             print("-----------------------------------------------------------")
             print("Nenhuma simulação encontrada.")
             input("Pressione Enter...")
             return None
         else:
-            df_simulacoes = pd.DataFrame(simulacoes, columns=['simulacao_id', 'nome', 'tamanho_disp', 'estado', 'consumo', 'orcamento', 'custo_investimento', 'economia_anual', 'data','usuario_id', 'ativo'])
+            df_simulacoes = pd.concat(blocos, ignore_index=True)
             print("\n----------------------------------------------------------------------------------------------------------------------------------------------")
             print(df_simulacoes)
             return df_simulacoes
@@ -612,6 +2646,165 @@ def consultar_simulacoes(usuario_id):
         return None
 
 
+# =========================================================================================
+# Senhas e Sessões
+# =========================================================================================
+# Custo do hash das senhas (scrypt): n = 2 ** custo. Cada +1 dobra o tempo e a memória de
+# cada verificação; senhas gravadas com outro custo são refeitas no próximo login.
+parametros_hash_senha = {'custo': 14, 'r': 8, 'p': 1}
+
+def gerar_hash_senha(senha, custo=None):
+    """
+    Gera o hash de uma senha com scrypt e um salt aleatório, no formato
+    'scrypt$<custo>$<r>$<p>$<salt>$<hash>' (cabe na coluna 'senha' de 255 caracteres).
+    """
+    import base64
+    import hashlib
+    import secrets
+
+    custo = custo or parametros_hash_senha['custo']
+    r, p = parametros_hash_senha['r'], parametros_hash_senha['p']
+    salt = secrets.token_bytes(16)
+    chave = hashlib.scrypt(senha.encode(), salt=salt, n=2 ** custo, r=r, p=p, maxmem=256 * 2 ** custo * r + 2 ** 20)
+    return '$'.join(['scrypt', str(custo), str(r), str(p), base64.b64encode(salt).decode(), base64.b64encode(chave).decode()])
+
+def verificar_senha(senha, senha_gravada):
+    """
+    Confere uma senha com o valor gravado no banco, em tempo constante.
+
+    Retorna:
+    tuple: (senha correta, precisa refazer o hash). Refazer é necessário para senhas antigas
+    gravadas sem hash ou com um custo diferente de 'parametros_hash_senha'.
+    """
+    import base64
+    import hashlib
+    import hmac
+
+    partes = senha_gravada.split('$')
+    if len(partes) != 6 or partes[0] != 'scrypt':
+        # Cadastro anterior ao hash: senha gravada em texto
+        return hmac.compare_digest(senha.encode(), senha_gravada.encode()), True
+
+    custo, r, p = (int(parte) for parte in partes[1:4])
+    salt, chave = base64.b64decode(partes[4]), base64.b64decode(partes[5])
+    calculada = hashlib.scrypt(senha.encode(), salt=salt, n=2 ** custo, r=r, p=p, dklen=len(chave), maxmem=256 * 2 ** custo * r + 2 ** 20)
+    desatualizada = (custo, r, p) != (parametros_hash_senha['custo'], parametros_hash_senha['r'], parametros_hash_senha['p'])
+    return hmac.compare_digest(calculada, chave), desatualizada
+
+class CacheSessoes:
+    """
+    Sessões de curta duração em memória: após um login, o token identifica o usuário sem
+    consultar o banco nem recalcular o hash da senha. Os tokens expiram após 'ttl' segundos
+    e, acima de 'max_sessoes', a sessão mais antiga é descartada.
+    """
+
+    def __init__(self, max_sessoes=10_000, ttl=900):
+        self.max_sessoes = max_sessoes
+        self.ttl = ttl
+        self.sessoes = OrderedDict()
+        self.trava = threading.Lock()
+
+    def criar(self, usuario_id):
+        import secrets
+
+        token = secrets.token_urlsafe(32)
+        with self.trava:
+            self.sessoes[token] = (usuario_id, time.monotonic() + self.ttl)
+            while len(self.sessoes) > self.max_sessoes:
+                self.sessoes.popitem(last=False)
+        return token
+
+    def obter(self, token):
+        """
+        Retorna o ID do usuário da sessão, ou None se o token não existir ou tiver expirado.
+        """
+        with self.trava:
+            sessao = self.sessoes.get(token)
+            if sessao is None:
+                return None
+            if time.monotonic() > sessao[1]:
+                del self.sessoes[token]
+                return None
+            return sessao[0]
+
+    def encerrar(self, token=None, usuario_id=None):
+        """
+        Encerra uma sessão (token), todas as sessões de um usuário ou, sem argumentos, todas.
+        """
+        with self.trava:
+            if token is not None:
+                self.sessoes.pop(token, None)
+            elif usuario_id is not None:
+                for token_usuario in [chave for chave, sessao in self.sessoes.items() if sessao[0] == usuario_id]:
+                    del self.sessoes[token_usuario]
+            else:
+                self.sessoes.clear()
+
+cache_sessoes = CacheSessoes()
+
+def registrar_usuario(nome, email, senha):
+    """
+    Grava um novo usuário com a senha em hash, obtendo o ID gerado no próprio INSERT
+    (RETURNING), sem prints nem input().
+
+    Retorna:
+    int: ID do novo usuário. Lança o IntegrityError do backend se o email já estiver cadastrado.
+    """
+    query = "INSERT INTO usuarios (nome, email, senha) VALUES (:nome, :email, :senha)"
+    with obter_conexao() as conn, closing(conn.cursor()) as cursor:
+        retorno = obter_backend().executar_retornando(
+            cursor, query, {'nome': nome, 'email': email, 'senha': gerar_hash_senha(senha)}, ['usuario_id']
+        )
+        conn.commit()
+    return int(retorno[0])
+
+def autenticar(email, senha):
+    """
+    Confere email e senha, sem prints nem input(). Senhas antigas (sem hash ou com outro custo)
+    são regravadas com o hash atual.
+
+    Retorna:
+    int: ID do usuário, ou None se o email não existir ou a senha estiver errada.
+    """
+    with obter_conexao() as conn, closing(conn.cursor()) as cursor:
+        cursor.execute("SELECT usuario_id, senha FROM usuarios WHERE email = :email", {'email': email})
+        usuario = cursor.fetchone()
+        if usuario is None:
+            return None
+
+        correta, desatualizada = verificar_senha(senha, usuario[1])
+        if correta and desatualizada:
+            # Regravar o hash é oportunista: se falhar (ex.: coluna 'senha' antiga, menor que o
+            # hash, antes da migração 4), o login continua válido e a troca fica para o próximo
+            try:
+                cursor.execute(
+                    "UPDATE usuarios SET senha = :senha WHERE usuario_id = :usuario_id",
+                    {'senha': gerar_hash_senha(senha), 'usuario_id': usuario[0]}
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+    return int(usuario[0]) if correta else None
+
+def iniciar_sessao(email, senha):
+    """
+    Autentica o usuário e abre uma sessão em 'cache_sessoes'.
+
+    Retorna:
+    tuple: (usuario_id, token), ou None se as credenciais forem inválidas.
+    """
+    usuario_id = autenticar(email, senha)
+    if usuario_id is None:
+        return None
+    return usuario_id, cache_sessoes.criar(usuario_id)
+
+def usuario_da_sessao(token):
+    """
+    ID do usuário de um token de sessão ainda válido (sem acessar o banco), ou None.
+    """
+    return cache_sessoes.obter(token)
+
+
 # =========================================================================================
 # Funções de Cadastro e Login
 # =========================================================================================
@@ -643,18 +2836,13 @@ def cadastrar_usuario():
         senha = input("Senha (8-16 caracteres): ")
 
     try:
-        query = "INSERT INTO usuarios (nome, email, senha) VALUES (:nome, :email, :senha)"
-        cursor.execute(query, {"nome": nome, "email": email, "senha": senha})
-        conn.commit()
+        # Grava a senha em hash e retorna o ID do novo usuário no próprio INSERT
+        usuario_id = registrar_usuario(nome, email, senha)
+
         print(f"Usuário {nome} cadastrado com sucesso!")
         input("Pressione Enter para continuar...")
-
-        # Retorna o ID do novo usuário
-        query = "SELECT usuario_id FROM usuarios WHERE email = :email"
-        cursor.execute(query, {'email': email})
-        usuario_id = cursor.fetchone()[0]
         return usuario_id
-    except oracledb.IntegrityError:
+    except obter_backend().IntegrityError:
         print("Erro: Email já cadastrado. Tente novamente.")
         input("Pressione Enter para continuar...")
         return None
@@ -683,13 +2871,11 @@ def login():
             senha = input("Senha (8-16 caracteres): ")
         
         try:
-            query = "SELECT usuario_id FROM usuarios WHERE email = :email AND senha = :senha"
-            cursor.execute(query, {'email': email, 'senha': senha})
-            user = cursor.fetchone()
-            if user:
+            usuario_id = autenticar(email, senha)
+            if usuario_id is not None:
                 print("Login realizado com sucesso!")
                 input("Pressione Enter para continuar...")
-                return user[0]  # Retorna o ID do usuário logado
+                return usuario_id  # Retorna o ID do usuário logado
             else:
                 print("Dados não encontrados!")
                 opcao = input("Deseja se cadastrar? 1 (sim) 2 (não): ")
@@ -712,6 +2898,365 @@ def login():
             return None
 
 
+# =========================================================================================
+# Acesso Assíncrono ao Banco (asyncio)
+# =========================================================================================
+# Versões assíncronas, sem prints nem input(), das operações de banco mais usadas. No Oracle
+# usam o pool de 'criar_pool_async': enquanto uma consulta espera a rede, o mesmo event loop
+# atende outras. No SQLite cada chamada roda em uma thread ('asyncio.to_thread').
+async def listar_dados_async(usuario_id, coluna=None, valor=None, condicao=None, coluna_retorno=None, ordenar_por=None, decrescente=False, limite=None, deslocamento=0):
+    """
+    Versão assíncrona de 'listar_dados' (mesmos parâmetros, sem exibir). Retorna um pd.DataFrame.
+    """
+    import pandas as pd
+
+    query, params = preparar_listagem(usuario_id, coluna, valor, condicao, coluna_retorno, ordenar_por, decrescente, limite, deslocamento)
+    colunas, linhas = await obter_backend().consultar_async(query, params)
+    return pd.DataFrame(linhas, columns=[coluna.lower() for coluna in colunas])
+
+async def consultar_simulacoes_async(usuario_id):
+    """
+    Versão assíncrona de 'consultar_simulacoes': todas as simulações ativas do usuário, com
+    as colunas de 'colunas_simulacoes' (DataFrame vazio se não houver nenhuma).
+    """
+    import pandas as pd
+
+    query = "SELECT * FROM simulacoes WHERE usuario_id = :usuario_id AND ativo = 'T'"
+    _, linhas = await obter_backend().consultar_async(query, {'usuario_id': usuario_id})
+    return pd.DataFrame(linhas, columns=colunas_simulacoes)
+
+async def criar_simulacao_async(usuario_id, nome, tamanho_disp, estado, consumo, orcamento):
+    """
+    Versão assíncrona de 'criar_simulacao': calcula e grava a simulação.
+
+    Retorna:
+    dict: Resultado de 'calcular_simulacoes' (valores escalares); só é gravada se 'valida'.
+    """
+    resultado = {chave: valor.item() for chave, valor in calcular_simulacoes(tamanho_disp, consumo, orcamento, estado).items()}
+    if resultado['valida']:
+        await obter_backend().executar_async(consulta_inserir_simulacao, {
+            'usuario_id': usuario_id,
+            'nome': nome,
+            'tamanho_disp': tamanho_disp,
+            'estado': estado,
+            'consumo': consumo,
+            'orcamento': orcamento,
+            'custo_investimento': resultado['custo_investimento'],
+            'economia_anual': resultado['economia_anual'],
+        })
+        invalidar_resultados(usuario_id)
+    return resultado
+
+async def autenticar_async(email, senha):
+    """
+    Versão assíncrona de 'autenticar'. O hash da senha (scrypt) é calculado em uma thread,
+    para não travar o event loop.
+
+    Retorna:
+    int: ID do usuário, ou None se o email não existir ou a senha estiver errada.
+    """
+    import asyncio
+
+    backend_atual = obter_backend()
+    _, linhas = await backend_atual.consultar_async("SELECT usuario_id, senha FROM usuarios WHERE email = :email", {'email': email})
+    if not linhas:
+        return None
+
+    usuario_id, senha_gravada = linhas[0]
+    correta, desatualizada = await asyncio.to_thread(verificar_senha, senha, senha_gravada)
+    if correta and desatualizada:
+        # Como em 'autenticar', uma falha ao regravar o hash não invalida o login
+        try:
+            await backend_atual.executar_async(
+                "UPDATE usuarios SET senha = :senha WHERE usuario_id = :usuario_id",
+                {'senha': await asyncio.to_thread(gerar_hash_senha, senha), 'usuario_id': usuario_id}
+            )
+        except Exception:
+            pass
+    return int(usuario_id) if correta else None
+
+async def fechar_conexoes_async():
+    """
+    Fecha o pool assíncrono do backend em uso, se tiver sido criado. Deve ser chamada no mesmo
+    event loop das funções '*_async' (ex.: ao final da corrotina passada a asyncio.run), antes
+    de usá-las em outro loop.
+    """
+    if backend is not None:
+        await backend.fechar_async()
+
+# =========================================================================================
+# Serviço HTTP/JSON
+# =========================================================================================
+# Tipos de conteúdo das exportações servidas em GET /resultados?formato=...
+tipos_conteudo_resultados = {
+    'json': 'application/json',
+    'csv': 'text/csv; charset=utf-8',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+}
+
+class ErroServico(Exception):
+    """
+    Erro de uma requisição ao serviço, respondido com o status HTTP informado.
+    """
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+def df_para_registros(df):
+    """
+    Converte um DataFrame em lista de dicts serializáveis em JSON (datas em ISO 8601).
+    """
+    import json
+
+    return json.loads(como_dataframe(df).to_json(orient='records', date_format='iso'))
+
+def serializar_resultados(df_resultados, formato='json'):
+    """
+    Serializa os resultados (saída de 'gerar_aviso') em memória, sem gravar arquivo.
+
+    Retorna:
+    bytes: Conteúdo no formato pedido ('json', 'csv', 'parquet' ou 'arrow').
+    """
+    import io
+
+    if formato == 'json':
+        return como_dataframe(df_resultados[colunas_resultados]).to_json(orient='records').encode()
+    if formato == 'csv':
+        return como_dataframe(df_resultados[colunas_resultados]).to_csv(index=False).encode()
+
+    buffer = io.BytesIO()
+    if formato == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(resultados_para_arrow(df_resultados), buffer, compression='zstd')
+    elif formato == 'arrow':
+        import pyarrow.feather as feather
+        feather.write_feather(resultados_para_arrow(df_resultados), buffer, compression='uncompressed')
+    else:
+        raise ValueError(f"Formato desconhecido: {formato} (use {', '.join(tipos_conteudo_resultados)})")
+    return buffer.getvalue()
+
+def ler_simulacoes_requisicao(corpo, colunas):
+    """
+    Lê a lista 'simulacoes' do corpo de uma requisição como DataFrame com as colunas exigidas.
+    """
+    import pandas as pd
+
+    simulacoes = corpo.get('simulacoes')
+    if not isinstance(simulacoes, list) or not simulacoes:
+        raise ErroServico(400, "Informe 'simulacoes' como uma lista não vazia.")
+    df = pd.DataFrame(simulacoes)
+    faltando = [coluna for coluna in colunas if coluna not in df.columns]
+    if faltando:
+        raise ErroServico(400, f"Campos obrigatórios ausentes: {', '.join(faltando)}")
+    return df
+
+def rota_criar_sessao(usuario_id, corpo, parametros, simulacao_id):
+    sessao = iniciar_sessao(str(corpo.get('email', '')), str(corpo.get('senha', '')))
+    if sessao is None:
+        raise ErroServico(401, "Email ou senha inválidos.")
+    return 201, {'usuario_id': sessao[0], 'token': sessao[1], 'expira_em_segundos': cache_sessoes.ttl}
+
+def rota_simular(usuario_id, corpo, parametros, simulacao_id):
+    df = ler_simulacoes_requisicao(corpo, ['nome', 'tamanho_disp', 'estado', 'consumo', 'orcamento'])
+    resultado = criar_simulacoes_em_lote(
+        usuario_id, df['nome'], df['tamanho_disp'], df['estado'].astype(str).str.upper(), df['consumo'], df['orcamento'],
+        persistir=bool(corpo.get('persistir', True))
+    )
+    return 201, {'simulacoes': df_para_registros(resultado)}
+
+def rota_listar(usuario_id, corpo, parametros, simulacao_id):
+    # Condição padrão ('=') só quando há coluna de filtro
+    condicao = parametros.get('condicao', '=').upper() if parametros.get('coluna') else None
+    valor = parametros.get('valor')
+    if condicao == 'BETWEEN' and 'inicio' in parametros and 'fim' in parametros:
+        valor = (parametros['inicio'], parametros['fim'])
+
+    df = listar_dados(
+        usuario_id, parametros.get('coluna'), valor, condicao,
+        parametros['colunas'].split(',') if parametros.get('colunas') else None,
+        parametros.get('ordenar_por'), parametros.get('decrescente', '').lower() in ('1', 'true', 'sim'),
+        min(int(parametros.get('limite', 100)), 1000), int(parametros.get('deslocamento', 0)), exibir=False
+    )
+    return 200, {'simulacoes': df_para_registros(df)}
+
+def rota_editar(usuario_id, corpo, parametros, simulacao_id):
+    if simulacao_id is not None:
+        corpo = {'simulacoes': [{**corpo, 'simulacao_id': simulacao_id}]}
+    df = ler_simulacoes_requisicao(corpo, ['simulacao_id', 'nome', 'tamanho_disp', 'estado', 'consumo', 'orcamento'])
+    resultado = editar_simulacoes_em_lote(
+        usuario_id, df['simulacao_id'], df['nome'], df['tamanho_disp'], df['estado'].astype(str).str.upper(),
+        df['consumo'], df['orcamento']
+    )
+    if simulacao_id is not None and not resultado['atualizada'].iloc[0]:
+        if not resultado['valida'].iloc[0]:
+            raise ErroServico(400, "Dados da simulação inválidos.")
+        raise ErroServico(404, f"Simulação {simulacao_id} não encontrada.")
+    return 200, {'simulacoes': df_para_registros(resultado)}
+
+def rota_excluir(usuario_id, corpo, parametros, simulacao_id):
+    simulacao_ids = [simulacao_id] if simulacao_id is not None else corpo.get('ids')
+    if not isinstance(simulacao_ids, list):
+        raise ErroServico(400, "Informe o ID na URL ou 'ids' como uma lista.")
+    excluidas = inativar_simulacoes(usuario_id, simulacao_ids)
+    if simulacao_id is not None and not excluidas:
+        raise ErroServico(404, f"Simulação {simulacao_id} não encontrada.")
+    return 200, {'excluidas': excluidas}
+
+def rota_exportar(usuario_id, corpo, parametros, simulacao_id):
+    formato = parametros.get('formato', 'json')
+    if formato not in tipos_conteudo_resultados:
+        raise ErroServico(400, f"Formato desconhecido: {formato} (use {', '.join(tipos_conteudo_resultados)})")
+    resultados = gerar_aviso(calcular_economias(consultar_simulacoes_compactas(usuario_id)))
+    return 200, (serializar_resultados(resultados, formato), tipos_conteudo_resultados[formato])
+
+# Rotas do serviço: (método, recurso) -> função. Todas, exceto POST /sessoes, exigem o
+# cabeçalho 'Authorization: Bearer <token>' obtido em POST /sessoes.
+rotas_servico = {
+    ('POST', 'sessoes'): rota_criar_sessao,
+    ('POST', 'simulacoes'): rota_simular,
+    ('GET', 'simulacoes'): rota_listar,
+    ('PUT', 'simulacoes'): rota_editar,
+    ('DELETE', 'simulacoes'): rota_excluir,
+    ('GET', 'resultados'): rota_exportar,
+}
+rotas_publicas = {('POST', 'sessoes')}
+
+def criar_manipulador_servico():
+    """
+    Cria a classe que trata as requisições HTTP (http.server é importado só no modo serviço).
+    """
+    import json
+    from http.server import BaseHTTPRequestHandler
+    from urllib.parse import parse_qsl, urlsplit
+
+    class ManipuladorServico(BaseHTTPRequestHandler):
+        server_version = 'GreenEnergyProvider/1.0'
+        tamanho_maximo_corpo = 10 * 2 ** 20
+
+        def log_message(self, formato, *args):
+            # Sem log por requisição: com centenas de requisições por segundo ele domina o tempo
+            pass
+
+        def responder(self, status, conteudo, tipo='application/json'):
+            if not isinstance(conteudo, bytes):
+                conteudo = json.dumps(conteudo, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(len(conteudo)))
+            self.end_headers()
+            self.wfile.write(conteudo)
+
+        def ler_corpo(self):
+            tamanho = int(self.headers.get('Content-Length') or 0)
+            if tamanho > self.tamanho_maximo_corpo:
+                raise ErroServico(413, "Corpo da requisição muito grande.")
+            if not tamanho:
+                return {}
+            try:
+                corpo = json.loads(self.rfile.read(tamanho))
+            except ValueError:
+                raise ErroServico(400, "Corpo da requisição não é um JSON válido.")
+            if not isinstance(corpo, dict):
+                raise ErroServico(400, "O corpo da requisição deve ser um objeto JSON.")
+            return corpo
+
+        def despachar(self):
+            try:
+                url = urlsplit(self.path)
+                partes = [parte for parte in url.path.split('/') if parte]
+                rota = rotas_servico.get((self.command, partes[0] if partes else ''))
+                if rota is None or len(partes) > 2:
+                    raise ErroServico(404, "Rota não encontrada.")
+                try:
+                    simulacao_id = int(partes[1]) if len(partes) == 2 else None
+                except ValueError:
+                    raise ErroServico(404, "Rota não encontrada.")
+
+                usuario_id = None
+                if (self.command, partes[0]) not in rotas_publicas:
+                    autorizacao = self.headers.get('Authorization', '')
+                    usuario_id = usuario_da_sessao(autorizacao[7:]) if autorizacao.startswith('Bearer ') else None
+                    if usuario_id is None:
+                        raise ErroServico(401, "Sessão inválida ou expirada.")
+
+                status, resposta = rota(usuario_id, self.ler_corpo(), dict(parse_qsl(url.query)), simulacao_id)
+                if isinstance(resposta, tuple):
+                    self.responder(status, *resposta)
+                else:
+                    self.responder(status, resposta)
+            except ErroServico as e:
+                self.responder(e.status, {'erro': str(e)})
+            except (ValueError, KeyError, TypeError) as e:
+                self.responder(400, {'erro': str(e)})
+            except Exception as e:
+                if isinstance(e, obter_backend().IntegrityError):
+                    self.responder(409, {'erro': str(e)})
+                else:
+                    print(f"Erro ao atender {self.command} {self.path}: {e}")
+                    self.responder(500, {'erro': "Erro interno do servidor."})
+
+        do_GET = do_POST = do_PUT = do_DELETE = despachar
+
+    return ManipuladorServico
+
+def criar_servidor(host='127.0.0.1', porta=8000, trabalhadores=8):
+    """
+    Cria o servidor HTTP do modo serviço, com um pool fixo de 'trabalhadores' threads que
+    compartilham o backend (no Oracle, o pool de sessões é dimensionado para o mesmo número).
+
+    Retorna:
+    http.server.ThreadingHTTPServer: Servidor pronto para 'serve_forever()' (porta=0 escolhe
+    uma porta livre, disponível em 'server_address').
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from http.server import ThreadingHTTPServer
+
+    class ServidorSimulador(ThreadingHTTPServer):
+        request_queue_size = 256
+
+        def __init__(self, endereco, manipulador):
+            super().__init__(endereco, manipulador)
+            self.executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix='http')
+
+        def process_request(self, request, client_address):
+            # Em vez de uma thread nova por conexão, usa o pool fixo de trabalhadores
+            self.executor.submit(self.process_request_thread, request, client_address)
+
+        def server_close(self):
+            super().server_close()
+            self.executor.shutdown(wait=True)
+
+    backend_atual = obter_backend()
+    if isinstance(backend_atual, BackendOracle) and backend_atual.pool is None:
+        backend_atual.opcoes_pool.setdefault('max_sessoes', trabalhadores)
+    if not verificar_conexao():
+        raise RuntimeError("Banco de dados indisponível.")
+
+    return ServidorSimulador((host, porta), criar_manipulador_servico())
+
+def iniciar_servidor(host='127.0.0.1', porta=8000, trabalhadores=8):
+    """
+    Executa o modo serviço (HTTP/JSON) até Ctrl+C. Rotas:
+
+    POST   /sessoes                {email, senha} -> {usuario_id, token}
+    POST   /simulacoes             {simulacoes: [...], persistir} -> resultados das simulações
+    GET    /simulacoes             ?coluna=&condicao=&valor=&ordenar_por=&decrescente=&limite=&deslocamento=&colunas=
+    PUT    /simulacoes[/<id>]      {simulacoes: [...]} ou os campos da simulação
+    DELETE /simulacoes[/<id>]      {ids: [...]} ou o ID na URL
+    GET    /resultados             ?formato=json|csv|parquet|arrow
+    """
+    servidor = criar_servidor(host, porta, trabalhadores)
+    print(f"Servindo em http://{servidor.server_address[0]}:{servidor.server_address[1]} com {trabalhadores} trabalhadores (Ctrl+C para sair)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("Encerrando serviço...")
+    finally:
+        servidor.server_close()
+        fechar_conexoes()
+
+
 # =========================================================================================
 # Funções do Menu Principal
 # =========================================================================================
@@ -720,6 +3265,9 @@ def menu(usuario_id):
     Função que exibe o menu principal e permite ao usuário interagir com o sistema.
     Dependendo da escolha, são exibidas opções de consultar, editar ou criar simulações.
     """
+    import pandas as pd
+
+    conexao = verificar_conexao()
     while conexao:
         limpar_tela()
         print("""-----------------------------------------------------------
@@ -731,7 +3279,7 @@ Bem-vindo ao Simulador de Introdução de energia sustentável
 2 - Editar/Excluir Simulações
 3 - Realizar Simulação
 4 - Sobre Nós (Recomendado)
-5 - Exportações de dados (Excel | JSON)
+5 - Exportações de dados (Excel | JSON | Parquet | CSV | Arrow)
 0 - Sair
 """)
         opcao = input("Escolha uma opção: ")
@@ -751,16 +3299,29 @@ Bem-vindo ao Simulador de Introdução de energia sustentável
                     case '1':
                         listar_colunas_linhas(usuario_id)
                     case '2':
-                        df_simulacoes = consultar_simulacoes(usuario_id)
-                        if df_simulacoes is not None:
-                            df_economias = calcular_economias(df_simulacoes)
+                        try:
+                            df_economias = obter_economias(usuario_id)
+                        except Exception as e:
+                            print(f"Erro ao consultar simulações: {e}")
+                            input("Pressione Enter...")
+                            continue
+
+                        if df_economias.empty:
+                            print("-----------------------------------------------------------")
+                            print("Nenhuma simulação encontrada.")
+                            input("Pressione Enter...")
+                        else:
                             aviso = gerar_aviso(df_economias)
                             print("-"*142)
                             print("\nRelatório de Economias e Redução de Carbono:\n")
                             print("-"*123)
                             print(aviso)
-                            acessar_economias(df_economias)
                             print("-"*123)
+                            print(f"\nProjeção de {premissas_fluxo_caixa['anos']} anos (VPL, TIR e payback com degradação e reajuste da tarifa):\n")
+                            print(gerar_projecao(df_economias))
+                            acessar_economias(df_economias, 'grafico_economias.png')
+                            print("-"*123)
+                            print("Gráfico de tempo para lucro sendo salvo em segundo plano em 'grafico_economias.png'")
                             input("Pressione Enter...")
 
             case '2':
@@ -845,81 +3406,47 @@ simulações de economia e eficiência energética como incentivo para a adoçã
                 print("""\n-------------------------------------------------
 1 - Excel
 2 - JSON
-3 - Ambos
+3 - Ambos (Excel e JSON)
+4 - Parquet
+5 - CSV (compactado)
+6 - Arrow
+Combine opções separando por vírgula (ex: 1,4)
 Enter - Menu
 """)
                 decisao = input("Opção: ")
-                
-                match(decisao):
-                    
-                    case '1':
-                        # Exporta somente para Excel
-                        df_simulacoes = consultar_simulacoes(usuario_id)
-                        if df_simulacoes is not None:
-                            df_economias = calcular_economias(df_simulacoes)
-                            if isinstance(df_economias, pd.DataFrame):
-                                aviso = gerar_aviso(df_economias)
-                                if isinstance(aviso, pd.DataFrame):
-                                    print("-" * 142)
-                                    nome_arq = input("Nome do Arquivo (Por padrão 'resultados_simulacoes'): ") or "resultados_simulacoes.xlsx"
-                                    if not nome_arq.endswith('.xlsx'):
-                                        nome_arq += '.xlsx'
-                                    exportar_para_excel(aviso, nome_arquivo_excel=nome_arq)
-                                else:
-                                    print("Erro: 'gerar_aviso' não retornou um DataFrame válido!")
-                            else:
-                                print("Erro: 'calcular_economias' não retornou um DataFrame válido!")
-                        else:
-                            print("Nenhum dado para ser exportado!")
-                    
-                    case '2':
-                        # Exporta somente para JSON
-                        df_simulacoes = consultar_simulacoes(usuario_id)
-                        if df_simulacoes is not None:
-                            df_economias = calcular_economias(df_simulacoes)
-                            if isinstance(df_economias, pd.DataFrame):
-                                aviso = gerar_aviso(df_economias)
-                                if isinstance(aviso, pd.DataFrame):
-                                    print("-" * 142)
-                                    nome_arq = input("Nome do Arquivo (Por padrão 'resultados_simulacoes'): ") or "resultados_simulacoes.json"
-                                    if not nome_arq.endswith('.json'):
-                                        nome_arq += '.json'
-                                    exportar_para_json(aviso, nome_arquivo_json=nome_arq)
-                                else:
-                                    print("Erro: 'gerar_aviso' não retornou um DataFrame válido!")
-                            else:
-                                print("Erro: 'calcular_economias' não retornou um DataFrame válido!")
-                        else:
-                            print("Nenhum dado para ser exportado!")
-                    
-                    case '3':
-                        # Exporta para ambos (Excel e JSON)
-                        df_simulacoes = consultar_simulacoes(usuario_id)
-                        if df_simulacoes is not None:
-                            df_economias = calcular_economias(df_simulacoes)
-                            if isinstance(df_economias, pd.DataFrame):
-                                aviso = gerar_aviso(df_economias)
-                                if isinstance(aviso, pd.DataFrame):
-                                    print("-" * 142)
-                                    nome_arq = input("Nome do Arquivo (Por padrão 'resultados_simulacoes'): ") or "resultados_simulacoes.xlsx"
-                                    if not nome_arq.endswith('.xlsx'):
-                                        nome_arq += '.xlsx'
-                                    nome_json = nome_arq.rsplit('.', 1)[0] + '.json'
-                                    exportar_para_excel(aviso, nome_arquivo_excel=nome_arq)
-                                    exportar_para_json(aviso, nome_arquivo_json=nome_json)
-                                else:
-                                    print("Erro: 'gerar_aviso' não retornou um DataFrame válido!")
-                            else:
-                                print("Erro: 'calcular_economias' não retornou um DataFrame válido!")
-                        else:
-                            print("Nenhum dado para ser exportado!")
-                    
-                    case _:
-                        print("Opção inválida")
-                
+                opcoes_formatos = {'1': ['xlsx'], '2': ['json'], '3': ['xlsx', 'json'], '4': ['parquet'], '5': ['csv'], '6': ['arrow']}
+
+                formatos = []
+                for opcao_formato in decisao.replace(' ', '').split(','):
+                    for formato in opcoes_formatos.get(opcao_formato, []):
+                        if formato not in formatos:
+                            formatos.append(formato)
+
+                if not decisao.strip():
+                    continue
+                if not formatos:
+                    print("Opção inválida")
+                    continue
+
+                # Uma consulta e um cálculo, compartilhados por todos os formatos escolhidos
+                try:
+                    aviso = obter_resultados(usuario_id)
+                except Exception as e:
+                    print(f"Erro ao consultar simulações: {e}")
+                    input("Pressione Enter...")
+                    continue
+
+                if not aviso.empty:
+                    print("-" * 142)
+                    nome_arq = input("Nome do Arquivo (Por padrão 'resultados_simulacoes'): ") or "resultados_simulacoes"
+                    exportar_resultados(aviso, nome_arq, formatos)
+                else:
+                    print("Nenhum dado para ser exportado!")
+                input("Pressione Enter...")
+
             case '0':
                 print("Saindo... Até logo!")
-                conn.close()  # Fecha a conexão ao sair
+                fechar_conexoes()  # Fecha as conexões com o banco ao sair
                 break
 
             case _:
@@ -927,8 +3454,227 @@ Enter - Menu
 
 
 
-usuario_id = login()
-if usuario_id:
-    menu(usuario_id)
-else:
-    print("Encerrando programa.")
\ No newline at end of file
+# =========================================================================================
+# Linha de Comando (uso sem interação, ex.: cron)
+# =========================================================================================
+def escrever_jsonl(df, saida=None):
+    """
+    Escreve as linhas de um DataFrame (ou SimulacoesCompactas) como JSON Lines, por padrão na saída padrão.
+    """
+    saida = saida or sys.stdout
+    if len(df):
+        linhas = como_dataframe(df).to_json(orient='records', lines=True, date_format='iso', force_ascii=False)
+        saida.write(linhas.rstrip('\n') + '\n')
+        saida.flush()
+
+def abrir_entrada(args):
+    """
+    Origem e formato da entrada de um subcomando: o arquivo informado ou a entrada padrão ('-').
+    """
+    if args.arquivo == '-':
+        formato = args.formato or 'jsonl'
+        if formato == 'parquet':
+            import io
+            # Parquet é binário e tem os metadados no fim do arquivo: lê os bytes da entrada inteira
+            return io.BytesIO(sys.stdin.buffer.read()), formato
+        return sys.stdin, formato
+    return args.arquivo, args.formato
+
+def comando_simular(args, usuario_id):
+    colunas_entrada = ['nome', 'tamanho_disp', 'estado', 'consumo', 'orcamento']
+    origem, formato = abrir_entrada(args)
+    for lote in ler_lotes_simulacoes(origem, args.tamanho_lote, formato):
+        faltando = [coluna for coluna in colunas_entrada if coluna not in lote.columns]
+        if faltando:
+            raise ValueError(f"Colunas ausentes na entrada: {', '.join(faltando)}")
+        escrever_jsonl(criar_simulacoes_em_lote(
+            usuario_id, lote['nome'], lote['tamanho_disp'], lote['estado'].str.upper(), lote['consumo'], lote['orcamento'],
+            persistir=not args.nao_gravar
+        ))
+
+def comando_listar(args, usuario_id):
+    escrever_jsonl(listar_dados(
+        usuario_id, coluna_retorno=args.colunas, ordenar_por=args.ordenar_por, decrescente=args.decrescente,
+        limite=args.limite, deslocamento=args.deslocamento, exibir=False
+    ))
+
+def comando_filtrar(args, usuario_id):
+    condicao = args.condicao.upper()
+    valores = args.valores if args.coluna in ('nome', 'estado') else [float(valor) for valor in args.valores]
+    if condicao == 'BETWEEN':
+        if len(valores) != 2:
+            raise ValueError("BETWEEN exige dois valores (início e fim).")
+        valor = tuple(valores)
+    else:
+        valor = valores[0]
+    escrever_jsonl(listar_dados(
+        usuario_id, args.coluna, valor, condicao, coluna_retorno=args.colunas,
+        ordenar_por=args.ordenar_por, decrescente=args.decrescente, limite=args.limite, exibir=False
+    ))
+
+def comando_exportar(args, usuario_id):
+    if args.arquivo == '-':
+        # Resultados bloco a bloco na saída padrão, com memória limitada ao tamanho do bloco
+        for bloco in consultar_simulacoes_em_blocos(usuario_id, args.tamanho_lote):
+            escrever_jsonl(gerar_aviso(calcular_economias(bloco)))
+        return
+
+    # As mensagens dos exportadores vão para a saída de erros: a saída padrão fica só com dados
+    with redirect_stdout(sys.stderr):
+        if args.streaming:
+            total = exportar_em_streaming(usuario_id, args.arquivo, args.tamanho_lote)
+            if total is None:
+                raise RuntimeError(f"Falha ao exportar para {args.arquivo}.")
+            if total == 0:
+                raise ValueError("Nenhuma simulação encontrada para exportar.")
+            return
+
+        resultados = gerar_aviso(calcular_economias(consultar_simulacoes_compactas(usuario_id)))
+        if resultados.empty:
+            raise ValueError("Nenhuma simulação encontrada para exportar.")
+        formatos = list(dict.fromkeys(args.formatos))
+        gerados = exportar_resultados(resultados, args.arquivo, formatos)
+        if len(gerados) < len(formatos):
+            raise RuntimeError(f"{len(formatos) - len(gerados)} de {len(formatos)} formatos não foram exportados.")
+
+def comando_editar(args, usuario_id):
+    colunas_entrada = ['simulacao_id', 'nome', 'tamanho_disp', 'estado', 'consumo', 'orcamento']
+    origem, formato = abrir_entrada(args)
+    for lote in ler_lotes_simulacoes(origem, args.tamanho_lote, formato):
+        faltando = [coluna for coluna in colunas_entrada if coluna not in lote.columns]
+        if faltando:
+            raise ValueError(f"Colunas ausentes na entrada: {', '.join(faltando)}")
+        escrever_jsonl(editar_simulacoes_em_lote(
+            usuario_id, lote['simulacao_id'], lote['nome'], lote['tamanho_disp'], lote['estado'].str.upper(),
+            lote['consumo'], lote['orcamento'], args.tamanho_lote
+        ))
+
+def comando_excluir(args, usuario_id):
+    import pandas as pd
+
+    # IDs na linha de comando ou, sem eles, um por linha na entrada padrão
+    simulacao_ids = args.ids or [int(linha) for linha in sys.stdin if linha.strip()]
+    excluidas = set(inativar_simulacoes(usuario_id, simulacao_ids, args.tamanho_lote))
+    escrever_jsonl(pd.DataFrame({
+        'simulacao_id': simulacao_ids,
+        'excluida': [simulacao_id in excluidas for simulacao_id in simulacao_ids],
+    }))
+
+def criar_parser():
+    """
+    Parser da linha de comando. Sem subcomando, abre o menu interativo.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='GS_PY.py',
+        description="Green Energy Provider: simulador de energia solar. Sem subcomando, abre o menu interativo. "
+                    "Os subcomandos escrevem os resultados em JSON Lines na saída padrão.",
+        epilog="Credenciais: --email (ou GS_PY_EMAIL) e a senha em GS_PY_SENHA (sem ela, é pedida no terminal).",
+    )
+    parser.add_argument('--sqlite', metavar='CAMINHO', help="usa um banco SQLite local em vez do Oracle")
+    parser.add_argument('--email', default=os.environ.get('GS_PY_EMAIL'), help="email do usuário (padrão: GS_PY_EMAIL)")
+    subparsers = parser.add_subparsers(dest='comando', metavar='comando')
+
+    def adicionar_entrada(subparser):
+        subparser.add_argument('arquivo', nargs='?', default='-', help="arquivo .csv, .jsonl ou .parquet ('-' ou omitido: entrada padrão)")
+        subparser.add_argument('--formato', choices=['csv', 'jsonl', 'parquet'], help="formato da entrada (padrão: pela extensão; jsonl na entrada padrão)")
+        subparser.add_argument('--tamanho-lote', type=int, default=1000, help="linhas processadas por lote (padrão: 1000)")
+
+    def adicionar_listagem(subparser):
+        subparser.add_argument('--colunas', nargs='+', choices=colunas_consultaveis, help="colunas retornadas (padrão: todas)")
+        subparser.add_argument('--ordenar-por', choices=colunas_consultaveis)
+        subparser.add_argument('--decrescente', action='store_true')
+        subparser.add_argument('--limite', type=int)
+
+    simular = subparsers.add_parser('simular', aliases=['simulate'], help="calcula (e grava) simulações de um arquivo ou da entrada padrão")
+    adicionar_entrada(simular)
+    simular.add_argument('--nao-gravar', action='store_true', help="apenas calcula, sem gravar no banco")
+    simular.set_defaults(funcao=comando_simular)
+
+    listar = subparsers.add_parser('listar', aliases=['list'], help="lista as simulações do usuário")
+    adicionar_listagem(listar)
+    listar.add_argument('--deslocamento', type=int, default=0)
+    listar.set_defaults(funcao=comando_listar)
+
+    filtrar = subparsers.add_parser('filtrar', aliases=['filter'], help="lista as simulações que atendem a um filtro")
+    filtrar.add_argument('coluna', choices=colunas_filtraveis)
+    filtrar.add_argument('condicao', type=str.upper, choices=list(condicoes_filtro))
+    filtrar.add_argument('valores', nargs='+', help="valor (ou início e fim, com BETWEEN)")
+    adicionar_listagem(filtrar)
+    filtrar.set_defaults(funcao=comando_filtrar)
+
+    exportar = subparsers.add_parser('exportar', aliases=['export'], help="exporta os resultados das simulações")
+    exportar.add_argument('arquivo', nargs='?', default='-', help="nome base do arquivo ('-' ou omitido: JSON Lines na saída padrão)")
+    exportar.add_argument('--formatos', nargs='+', choices=list(exportadores), default=['xlsx', 'json'])
+    exportar.add_argument('--streaming', action='store_true', help="exporta em blocos (.xlsx, .json ou .jsonl), com memória limitada")
+    exportar.add_argument('--tamanho-lote', type=int, default=5000, help="simulações por bloco (padrão: 5000)")
+    exportar.set_defaults(funcao=comando_exportar)
+
+    editar = subparsers.add_parser('editar', aliases=['edit'], help="edita simulações (com 'simulacao_id') de um arquivo ou da entrada padrão")
+    adicionar_entrada(editar)
+    editar.set_defaults(funcao=comando_editar)
+
+    excluir = subparsers.add_parser('excluir', aliases=['delete'], help="exclui simulações pelos IDs (ou um ID por linha na entrada padrão)")
+    excluir.add_argument('ids', nargs='*', type=int)
+    excluir.add_argument('--tamanho-lote', type=int, default=1000)
+    excluir.set_defaults(funcao=comando_excluir)
+
+    servidor = subparsers.add_parser('servidor', aliases=['serve'], help="inicia o serviço HTTP/JSON")
+    servidor.add_argument('--host', default='127.0.0.1')
+    servidor.add_argument('--porta', type=int, default=8000)
+    servidor.add_argument('--trabalhadores', type=int, default=8)
+
+    return parser
+
+def executar_linha_de_comando(argv=None):
+    """
+    Ponto de entrada do programa.
+
+    Retorna:
+    int: Código de saída (0 sucesso, 1 erro na execução, 2 erro de uso ou de autenticação).
+    """
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    if args.sqlite:
+        configurar_backend('sqlite', caminho=args.sqlite)
+
+    if args.comando is None:
+        usuario_id = login()
+        if usuario_id:
+            menu(usuario_id)
+        else:
+            print("Encerrando programa.")
+        return 0
+
+    if args.comando in ('servidor', 'serve'):
+        iniciar_servidor(args.host, args.porta, args.trabalhadores)
+        return 0
+
+    if not args.email:
+        parser.error("informe o usuário com --email ou GS_PY_EMAIL")
+    senha = os.environ.get('GS_PY_SENHA')
+    if senha is None:
+        import getpass
+        senha = getpass.getpass("Senha: ", stream=sys.stderr)
+
+    try:
+        usuario_id = autenticar(args.email, senha)
+        if usuario_id is None:
+            print("Erro: email ou senha inválidos.", file=sys.stderr)
+            return 2
+        args.funcao(args, usuario_id)
+        return 0
+    except BrokenPipeError:
+        # Saída fechada antes do fim (ex.: '| head'): descarta o restante sem erro
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except Exception as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    finally:
+        fechar_conexoes()
+
+
+if __name__ == "__main__":
+    sys.exit(executar_linha_de_comando())
\ No newline at end of file
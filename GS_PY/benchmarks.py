@@ -0,0 +1,413 @@
+# =========================================================================================
+# Benchmarks do GREEN ENERGY PROVIDER
+# =========================================================================================
+'''
+Medições de desempenho das rotinas de cálculo do simulador.
+
+Uso (a partir da pasta GS_PY):
+    python benchmarks.py
+'''
+
+# Importações
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+import GS_PY
+
+
+# =========================================================================================
+# Funções de Apoio
+# =========================================================================================
+def gerar_simulacoes_aleatorias(quantidade, semente=42):
+    """
+    Gera um DataFrame de simulações sintéticas com o mesmo formato de 'consultar_simulacoes'.
+    """
+    rng = np.random.default_rng(semente)
+    tamanho_disp = rng.uniform(10, 5000, quantidade)
+    consumo = rng.uniform(100, 50000, quantidade)
+    custo_investimento = tamanho_disp * 1000
+    economia_anual = np.minimum(consumo * 12, tamanho_disp * 150) * 0.50
+    return pd.DataFrame({
+        'simulacao_id': np.arange(1, quantidade + 1),
+        'nome': [f"Simulação {i}" for i in range(quantidade)],
+        'tamanho_disp': tamanho_disp,
+        'estado': rng.choice(GS_PY.estados_UF, quantidade),
+        'consumo': consumo,
+        'orcamento': rng.uniform(1000, 5_000_000, quantidade),
+        'custo_investimento': custo_investimento,
+        'economia_anual': economia_anual,
+    })
+
+def medir(funcao, *args, repeticoes=3):
+    """
+    Executa a função algumas vezes e retorna o melhor tempo (em segundos).
+    """
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+# =========================================================================================
+# Benchmark: calcular_economias
+# =========================================================================================
+def calcular_tempo_para_lucro_original(custo_investimento, economia_anual):
+    """
+    Cópia fiel da versão original de 'calcular_tempo_para_lucro', usada só na medição.
+    """
+    # Calcular o tempo para lucro em anos, dividindo o custo de investimento pela economia anual
+    tempo_anos = custo_investimento / economia_anual
+    return round(tempo_anos, 2)
+
+def calcular_economias_por_linha(simulacao_data):
+    """
+    Implementação original (linha a linha com df.apply), copiada sem alterações e mantida apenas
+    como referência de tempo. As duas versões diferem de propósito quando não há economia anual:
+    aqui a divisão lança ZeroDivisionError, na vetorizada o payback fica NaN (indefinido).
+    """
+    df = pd.DataFrame(simulacao_data)
+    df['tempo_para_lucro_anos'] = df.apply(
+        lambda row: calcular_tempo_para_lucro_original(row['custo_investimento'], row['economia_anual']),
+        axis=1
+    )
+    df['economia_mensal_R$'] = df['economia_anual'] / 12
+    df['reducao_carbono_KG'] = df['consumo'] * 0.2
+    df['rentabilidade'] = (df['economia_anual'] / df['custo_investimento']) * 100
+    df['tempo_para_lucro_anos'] = df['tempo_para_lucro_anos'].apply(lambda x: max(x, 0) if pd.notnull(x) else 0)
+    df['economia_mensal_R$'] = df['economia_mensal_R$'].apply(lambda x: max(x, 0) if pd.notnull(x) else 0)
+    df['reducao_carbono_KG'] = df['reducao_carbono_KG'].apply(lambda x: max(x, 0) if pd.notnull(x) else 0)
+    return df
+
+def benchmark_calcular_economias(quantidades=(1_000, 10_000, 50_000)):
+    print("-" * 70)
+    print("calcular_economias: linha a linha (apply) x vetorizado")
+    print("-" * 70)
+    for quantidade in quantidades:
+        df = gerar_simulacoes_aleatorias(quantidade)
+
+        # Confere se as duas implementações chegam ao mesmo resultado (todas com economia anual)
+        colunas = ['tempo_para_lucro_anos', 'economia_mensal_R$', 'reducao_carbono_KG', 'rentabilidade']
+        esperado = calcular_economias_por_linha(df)[colunas].to_numpy(dtype=float)
+        obtido = GS_PY.calcular_economias(df)[colunas].to_numpy(dtype=float)
+        assert np.allclose(esperado, obtido), "Resultados divergentes entre as implementações!"
+
+        # Diferença intencional: sem economia anual a original falha e a vetorizada retorna NaN
+        sem_economia = df.head(10).assign(economia_anual=0.0)
+        try:
+            calcular_economias_por_linha(sem_economia)
+        except ZeroDivisionError:
+            pass
+        else:
+            raise AssertionError("A implementação original deveria falhar sem economia anual!")
+        assert GS_PY.calcular_economias(sem_economia)['tempo_para_lucro_anos'].isna().all(), "Payback sem economia anual deveria ser NaN!"
+
+        tempo_linha = medir(calcular_economias_por_linha, df)
+        tempo_vetor = medir(GS_PY.calcular_economias, df)
+        print(f"{quantidade:>10} simulações | apply: {tempo_linha * 1000:9.2f} ms | "
+              f"vetorizado: {tempo_vetor * 1000:8.2f} ms | {tempo_linha / tempo_vetor:7.1f}x")
+
+
+# =========================================================================================
+# Benchmark: tempo de inicialização (python -X importtime)
+# =========================================================================================
+def verificar_tempo_importacao(limite_ms=100, modulos_proibidos=('oracledb', 'numpy', 'pandas', 'matplotlib')):
+    """
+    Mede o custo de 'import GS_PY' com 'python -X importtime' em um processo novo e confere
+    se ele fica dentro do orçamento de inicialização e não carrega bibliotecas pesadas.
+    """
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import GS_PY'],
+        cwd=pasta, capture_output=True, text=True, check=True
+    )
+
+    # Cada linha tem o formato: "import time: <self us> | <cumulativo us> | <módulo>"
+    tempos = {}
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        _, cumulativo, modulo = linha.split('|')
+        tempos[modulo.strip()] = int(cumulativo) / 1000
+
+    carregados = [modulo for modulo in modulos_proibidos if modulo in tempos]
+    tempo_ms = tempos['GS_PY']
+
+    print("-" * 70)
+    print("Inicialização: python -X importtime -c 'import GS_PY'")
+    print("-" * 70)
+    print(f"import GS_PY: {tempo_ms:.2f} ms (orçamento: {limite_ms} ms)")
+    assert not carregados, f"Bibliotecas pesadas carregadas na importação: {carregados}"
+    assert tempo_ms <= limite_ms, f"Importação acima do orçamento: {tempo_ms:.2f} ms > {limite_ms} ms"
+
+
+
+# =========================================================================================
+# Benchmark: formatos de exportação
+# =========================================================================================
+def benchmark_formatos_exportacao(quantidade=50_000):
+    """
+    Compara tempo de escrita e tamanho do arquivo entre os formatos de exportação.
+    """
+    aviso = GS_PY.gerar_aviso(GS_PY.calcular_economias(gerar_simulacoes_aleatorias(quantidade)))
+    formatos = [
+        ('Excel (.xlsx)', GS_PY.exportar_para_excel, 'resultados.xlsx', {}),
+        ('JSON Lines (.json)', GS_PY.exportar_para_json, 'resultados.json', {}),
+        ('CSV gzip (.csv.gz)', GS_PY.exportar_para_csv, 'resultados.csv.gz', {}),
+        ('CSV zstd (.csv.zst)', GS_PY.exportar_para_csv, 'resultados.csv.zst', {}),
+        ('Parquet snappy', GS_PY.exportar_para_parquet, 'resultados_snappy.parquet', {'compressao': 'snappy'}),
+        ('Parquet zstd', GS_PY.exportar_para_parquet, 'resultados_zstd.parquet', {'compressao': 'zstd'}),
+        ('Arrow IPC (zero-copy)', GS_PY.exportar_para_arrow, 'resultados.arrow', {}),
+    ]
+
+    print("-" * 70)
+    print(f"Formatos de exportação ({quantidade} simulações)")
+    print("-" * 70)
+    with tempfile.TemporaryDirectory() as pasta:
+        for descricao, exportar, nome_arquivo, opcoes in formatos:
+            caminho = os.path.join(pasta, nome_arquivo)
+            inicio = time.perf_counter()
+            exportar(aviso, caminho, **opcoes)
+            tempo = time.perf_counter() - inicio
+            if not os.path.exists(caminho):
+                print(f"{descricao:<24} | indisponível (dependência ausente?)")
+                continue
+            tamanho_kb = os.path.getsize(caminho) / 1024
+            print(f"{descricao:<24} | escrita: {tempo * 1000:9.2f} ms | tamanho: {tamanho_kb:9.1f} KB")
+
+
+
+# =========================================================================================
+# Benchmark: análise de sensibilidade
+# =========================================================================================
+def benchmark_sensibilidade(pontos_por_eixo=(10, 32, 56)):
+    print("-" * 70)
+    print("analisar_sensibilidade: grade custo x produção x preço x área")
+    print("-" * 70)
+    for pontos in pontos_por_eixo:
+        grade = dict(
+            tamanho_disp=np.linspace(10, 5000, pontos),
+            custo_por_m2=np.linspace(600, 1400, pontos),
+            producao_por_m2=np.linspace(100, 200, pontos),
+            preco_kwh=np.linspace(0.3, 1.0, pontos),
+        )
+        tempo = medir(lambda: GS_PY.analisar_sensibilidade(20000, **grade))
+        combinacoes = pontos ** 4
+        print(f"{combinacoes:>12} combinações | {tempo * 1000:9.2f} ms | {combinacoes / tempo / 1e6:8.1f} M combinações/s")
+
+
+
+# =========================================================================================
+# Benchmark: Monte Carlo
+# =========================================================================================
+def benchmark_monte_carlo(simulacoes=100, cenarios=100_000):
+    """
+    Mede cenários por segundo do 'simular_monte_carlo' com 1 processo e com todos os núcleos.
+    """
+    carteira = gerar_simulacoes_aleatorias(simulacoes)
+    total = simulacoes * cenarios
+    print("-" * 70)
+    print(f"simular_monte_carlo: {simulacoes} simulações x {cenarios} cenários = {total:.0e} sorteios")
+    print("-" * 70)
+    for processos in sorted({1, os.cpu_count() or 1}):
+        tempo = medir(
+            GS_PY.simular_monte_carlo, carteira['tamanho_disp'], carteira['consumo'], carteira['estado'],
+            cenarios, 42, processos, repeticoes=1
+        )
+        print(f"{processos:>3} processo(s) | {tempo:7.2f} s | {total / tempo / 1e6:8.2f} M sorteios/s")
+
+
+# =========================================================================================
+# Benchmark: projeção de fluxo de caixa
+# =========================================================================================
+def benchmark_fluxo_caixa(quantidades=(1_000, 10_000, 100_000)):
+    """
+    Mede a projeção ano a ano (VPL, TIR e paybacks) sobre a matriz simulações x anos.
+    """
+    print("-" * 70)
+    print(f"projetar_fluxo_caixa: {GS_PY.premissas_fluxo_caixa['anos']} anos por simulação")
+    print("-" * 70)
+    for quantidade in quantidades:
+        df = gerar_simulacoes_aleatorias(quantidade)
+        tempo = medir(GS_PY.projetar_fluxo_caixa, df['tamanho_disp'], df['consumo'], df['estado'])
+        print(f"{quantidade:>10} simulações | {tempo * 1000:9.2f} ms | {quantidade / tempo / 1e3:8.1f} mil simulações/s")
+
+
+# =========================================================================================
+# Benchmark: armazenamento compacto x DataFrame
+# =========================================================================================
+def benchmark_armazenamento_compacto(quantidade=200_000):
+    """
+    Compara memória e tempo de leitura entre o DataFrame de 'consultar_simulacoes_em_blocos'
+    e o 'consultar_simulacoes_compactas', em um banco SQLite em memória.
+    """
+    GS_PY.configurar_backend('sqlite', caminho=':memory:')
+    with GS_PY.obter_conexao() as conn:
+        conn.execute("INSERT INTO usuarios (nome, email, senha) VALUES ('benchmark', 'benchmark@gs.py', '-')")
+        conn.commit()
+    # Nomes com tamanhos variados (5 a 40 caracteres, com alguns perto do limite de 100 da coluna),
+    # para que a memória dos textos não dependa de todos terem o mesmo tamanho
+    rng = np.random.default_rng(7)
+    tamanhos = np.where(rng.random(quantidade) < 0.001, 100, rng.integers(5, 41, quantidade))
+    simulacoes = gerar_simulacoes_aleatorias(quantidade)
+    simulacoes['nome'] = [(f"Fazenda {i} - Talhão " + "Área de plantio " * 7)[:tamanho] for i, tamanho in enumerate(tamanhos)]
+    GS_PY.inserir_simulacoes_em_lote(1, simulacoes, tamanho_lote=10_000)
+
+    leituras = [
+        ('DataFrame (fetchmany)', lambda: pd.concat(list(GS_PY.consultar_simulacoes_em_blocos(1)), ignore_index=True)),
+        ('Compacto', lambda: GS_PY.consultar_simulacoes_compactas(1)),
+        ('Compacto (só números)', lambda: GS_PY.consultar_simulacoes_compactas(1, ['simulacao_id', 'custo_investimento', 'economia_anual', 'consumo'])),
+    ]
+
+    print("-" * 70)
+    print(f"Leitura de {quantidade} simulações: memória e tempo")
+    print("-" * 70)
+    try:
+        for descricao, ler in leituras:
+            tempo = medir(ler, repeticoes=1)
+            dados = ler()
+            # Memória da própria estrutura: buffers dos arrays no compacto, objetos Python inclusos no DataFrame
+            memoria = (dados.nbytes if isinstance(dados, GS_PY.SimulacoesCompactas) else dados.memory_usage(deep=True).sum()) / 1024 ** 2
+            print(f"{descricao:<24} | leitura: {tempo * 1000:9.2f} ms | memória: {memoria:8.1f} MB")
+    finally:
+        GS_PY.fechar_conexoes()
+
+
+# =========================================================================================
+# Teste de carga: modo serviço (HTTP/JSON) com SQLite local
+# =========================================================================================
+def servir_para_teste(caminho_banco, trabalhadores, fila):
+    """
+    Processo do servidor no teste de carga: assim os clientes não disputam o GIL com ele.
+    """
+    GS_PY.configurar_backend('sqlite', caminho=caminho_banco)
+    servidor = GS_PY.criar_servidor(porta=0, trabalhadores=trabalhadores)
+    fila.put(servidor.server_address[1])
+    servidor.serve_forever()
+
+def teste_carga_servico(requisicoes=2000, clientes=16, trabalhadores=8, simulacoes_iniciais=1000):
+    """
+    Sobe o serviço HTTP em outro processo, em uma porta livre e com um banco SQLite temporário,
+    e dispara requisições concorrentes (70% listagem, 20% simulação, 10% exportação de
+    resultados). Mostra requisições por segundo e latências p50/p95/p99.
+    """
+    import http.client
+    import json
+    import multiprocessing
+    from concurrent.futures import ThreadPoolExecutor
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_banco = os.path.join(pasta, 'carga.db')
+        GS_PY.configurar_backend('sqlite', caminho=caminho_banco)
+        usuario_id = GS_PY.registrar_usuario('Carga', 'carga@gs.py', 'Senha123!')
+        GS_PY.inserir_simulacoes_em_lote(usuario_id, gerar_simulacoes_aleatorias(simulacoes_iniciais))
+        GS_PY.fechar_conexoes()
+
+        fila = multiprocessing.Queue()
+        processo = multiprocessing.Process(target=servir_para_teste, args=(caminho_banco, trabalhadores, fila), daemon=True)
+        processo.start()
+        porta = fila.get(timeout=30)
+
+        def requisitar(metodo, caminho, corpo=None, token=None):
+            conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=30)
+            cabecalhos = {'Content-Type': 'application/json'}
+            if token:
+                cabecalhos['Authorization'] = f'Bearer {token}'
+            conexao.request(metodo, caminho, json.dumps(corpo) if corpo is not None else None, cabecalhos)
+            resposta = conexao.getresponse()
+            conteudo = resposta.read()
+            conexao.close()
+            return resposta.status, conteudo
+
+        try:
+            _, conteudo = requisitar('POST', '/sessoes', {'email': 'carga@gs.py', 'senha': 'Senha123!'})
+            token = json.loads(conteudo)['token']
+            simulacao = {'simulacoes': [{'nome': 'Carga', 'tamanho_disp': 500, 'estado': 'SP', 'consumo': 2000, 'orcamento': 600000}]}
+            operacoes = (
+                [('GET', '/simulacoes?limite=20&ordenar_por=economia_anual&decrescente=1', None)] * 7
+                + [('POST', '/simulacoes', simulacao)] * 2
+                + [('GET', '/resultados?formato=json', None)]
+            )
+
+            def executar(indice):
+                metodo, caminho, corpo = operacoes[indice % len(operacoes)]
+                inicio = time.perf_counter()
+                status, _ = requisitar(metodo, caminho, corpo, token)
+                return status, time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=clientes) as executor:
+                respostas = list(executor.map(executar, range(requisicoes)))
+            tempo = time.perf_counter() - inicio
+        finally:
+            processo.terminate()
+            processo.join()
+
+    latencias = np.array([latencia for _, latencia in respostas]) * 1000
+    erros = sum(1 for status, _ in respostas if status >= 400)
+    print("-" * 70)
+    print(f"Serviço HTTP: {requisicoes} requisições, {clientes} clientes, {trabalhadores} trabalhadores (SQLite)")
+    print("-" * 70)
+    print(f"{requisicoes / tempo:8.1f} req/s | p50: {np.percentile(latencias, 50):7.2f} ms | "
+          f"p95: {np.percentile(latencias, 95):7.2f} ms | p99: {np.percentile(latencias, 99):7.2f} ms | erros: {erros}")
+
+# =========================================================================================
+# Benchmark: acesso síncrono x assíncrono (asyncio)
+# =========================================================================================
+def benchmark_acesso_assincrono(usuarios=50, consultas_por_usuario=10, simulacoes_por_usuario=200):
+    """
+    Compara o tempo para atender 'usuarios' clientes simultâneos, cada um com algumas listagens:
+    pelo caminho síncrono (uma consulta por vez) e pelo assíncrono (todas multiplexadas em um
+    event loop com asyncio.gather). Usa um banco SQLite temporário; com o Oracle, o ganho do
+    caminho assíncrono cresce com a latência de rede.
+    """
+    import asyncio
+
+    with tempfile.TemporaryDirectory() as pasta:
+        GS_PY.configurar_backend('sqlite', caminho=os.path.join(pasta, 'assincrono.db'))
+        ids = []
+        for indice in range(usuarios):
+            usuario_id = GS_PY.registrar_usuario(f'Usuario {indice}', f'usuario{indice}@gs.py', 'Senha123!')
+            GS_PY.inserir_simulacoes_em_lote(usuario_id, gerar_simulacoes_aleatorias(simulacoes_por_usuario, semente=indice))
+            ids.append(usuario_id)
+        consulta = dict(coluna='tamanho_disp', valor=1000, condicao='>', ordenar_por='economia_anual', decrescente=True, limite=20)
+
+        def sincrono():
+            for usuario_id in ids:
+                for _ in range(consultas_por_usuario):
+                    GS_PY.listar_dados(usuario_id, exibir=False, **consulta)
+
+        async def assincrono():
+            await asyncio.gather(*(
+                GS_PY.listar_dados_async(usuario_id, **consulta)
+                for usuario_id in ids for _ in range(consultas_por_usuario)
+            ))
+
+        try:
+            total = usuarios * consultas_por_usuario
+            print("-" * 70)
+            print(f"Acesso ao banco: {usuarios} usuários x {consultas_por_usuario} consultas ({GS_PY.obter_backend().nome})")
+            print("-" * 70)
+            for descricao, executar in [('Síncrono', sincrono), ('Assíncrono (asyncio)', lambda: asyncio.run(assincrono()))]:
+                tempo = medir(executar, repeticoes=1)
+                print(f"{descricao:<24} | {tempo * 1000:9.2f} ms | {total / tempo:8.1f} consultas/s")
+        finally:
+            GS_PY.fechar_conexoes()
+
+
+if __name__ == "__main__":
+    verificar_tempo_importacao()
+    benchmark_calcular_economias()
+    benchmark_formatos_exportacao()
+    benchmark_sensibilidade()
+    benchmark_monte_carlo()
+    benchmark_fluxo_caixa()
+    benchmark_armazenamento_compacto()
+    teste_carga_servico()
+    benchmark_acesso_assincrono()
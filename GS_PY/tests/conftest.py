@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import GS_PY
+
+
+@pytest.fixture
+def banco_sqlite(tmp_path):
+    """
+    Backend SQLite temporário com um usuário cadastrado; retorna o ID do usuário.
+    """
+    GS_PY.configurar_backend('sqlite', caminho=str(tmp_path / 'gs_py.db'))
+    GS_PY.cache_resultados.descartar()
+    yield GS_PY.registrar_usuario('Teste', 'teste@exemplo.com', 'senha-teste')
+    GS_PY.cache_resultados.descartar()
+    GS_PY.fechar_conexoes()
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+import GS_PY
+
+
+def test_nomes_ocupam_so_os_proprios_bytes():
+    nomes = ['Sítio'] * 10_000 + ['x' * 120]
+    compactas = GS_PY.SimulacoesCompactas({'simulacao_id': np.arange(len(nomes)), 'nome': nomes})
+
+    texto = compactas.dados['nome']
+    assert texto.buffer.nbytes == sum(len(nome.encode()) for nome in nomes)
+    assert compactas.nbytes < 30 * len(nomes)  # largura fixa (UTF-32 do maior nome) passaria de 480 bytes por linha
+
+
+def test_conversoes_preservam_os_nomes():
+    df = pd.DataFrame({'simulacao_id': [1, 2, 3], 'nome': ['Á', '', 'Fazenda São João'], 'estado': ['SP', 'XX', 'RJ']})
+    compactas = GS_PY.SimulacoesCompactas.de_dataframe(df)
+
+    assert list(compactas['nome']) == list(df['nome'])
+    assert compactas.para_dataframe()['nome'].tolist() == list(df['nome'])
+    assert compactas.para_arrow().column('nome').to_pylist() == list(df['nome'])
+    assert list(compactas[['nome']]['nome']) == list(df['nome'])
@@ -0,0 +1,53 @@
+import pytest
+
+import GS_PY
+
+
+def criar_simulacoes(usuario_id):
+    GS_PY.criar_simulacoes_em_lote(usuario_id, ['A', 'B'], [100, 50], ['SP', 'RJ'], [1000, 500], [200000, 100000])
+    return GS_PY.obter_economias(usuario_id)['simulacao_id'].tolist()
+
+
+def test_edicao_sem_mudar_economia_atualiza_nome_e_orcamento(banco_sqlite):
+    simulacao_id, _ = criar_simulacoes(banco_sqlite)
+
+    # Mesma área, estado e consumo: custo e economia não mudam, só nome e orçamento
+    GS_PY.editar_simulacoes_em_lote(banco_sqlite, [simulacao_id], ['A-renomeada'], [100], ['SP'], [1000], [999999])
+
+    economias = GS_PY.obter_economias(banco_sqlite).set_index('simulacao_id')
+    assert economias.loc[simulacao_id, 'nome'] == 'A-renomeada'
+    assert economias.loc[simulacao_id, 'orcamento'] == 999999
+
+
+def test_linhas_sem_alteracao_sao_reaproveitadas(banco_sqlite, monkeypatch):
+    simulacao_id, outra_id = criar_simulacoes(banco_sqlite)
+    GS_PY.editar_simulacoes_em_lote(banco_sqlite, [simulacao_id], ['A'], [80], ['SP'], [1000], [200000])
+
+    calculadas = []
+    calcular_economias = GS_PY.calcular_economias
+    monkeypatch.setattr(GS_PY, 'calcular_economias', lambda df: calculadas.extend(df['simulacao_id']) or calcular_economias(df))
+
+    economias = GS_PY.obter_economias(banco_sqlite).set_index('simulacao_id')
+    assert calculadas == [simulacao_id]
+    assert economias.loc[simulacao_id, 'custo_investimento'] == 80 * 1000
+    assert economias.loc[outra_id, 'nome'] == 'B'
+
+
+def test_usuario_sem_simulacoes_retorna_vazio(banco_sqlite):
+    economias = GS_PY.obter_economias(banco_sqlite)
+    assert economias.empty
+    assert GS_PY.obter_resultados(banco_sqlite).empty
+
+
+def test_erro_do_banco_e_propagado_e_mantem_o_cache(banco_sqlite, monkeypatch):
+    criar_simulacoes(banco_sqlite)
+    GS_PY.invalidar_resultados(banco_sqlite)
+
+    def falhar(*args, **kwargs):
+        raise RuntimeError("banco indisponível")
+        yield
+
+    monkeypatch.setattr(GS_PY, 'consultar_simulacoes_em_blocos', falhar)
+    with pytest.raises(RuntimeError):
+        GS_PY.obter_economias(banco_sqlite)
+    assert banco_sqlite in GS_PY.cache_resultados.entradas
@@ -0,0 +1,87 @@
+import io
+import json
+
+import pandas as pd
+import pytest
+
+import GS_PY
+
+entradas = pd.DataFrame({
+    'nome': ['2024', 'Sítio'],
+    'tamanho_disp': [30, 50],
+    'estado': ['sp', 'MG'],
+    'consumo': [400, 800],
+    'orcamento': [50000, 100000],
+})
+
+
+@pytest.fixture
+def cli(banco_sqlite, monkeypatch, capsys):
+    """
+    Executa a linha de comando no próprio processo, como o usuário do 'banco_sqlite'.
+    Retorna (código de saída, linhas JSON da saída padrão, saída de erros).
+    """
+    monkeypatch.setenv('GS_PY_EMAIL', 'teste@exemplo.com')
+    monkeypatch.setenv('GS_PY_SENHA', 'senha-teste')
+
+    def executar(*argv, entrada=None):
+        if entrada is not None:
+            entrada = entrada if isinstance(entrada, bytes) else entrada.encode()
+            monkeypatch.setattr('sys.stdin', io.TextIOWrapper(io.BytesIO(entrada), encoding='utf-8'))
+        codigo = GS_PY.executar_linha_de_comando(list(argv))
+        saida = capsys.readouterr()
+        return codigo, [json.loads(linha) for linha in saida.out.splitlines()], saida.err
+
+    return executar
+
+
+def test_simular_pela_entrada_padrao(cli):
+    codigo, linhas, _ = cli('simular', entrada=entradas.to_json(orient='records', lines=True))
+
+    assert codigo == 0
+    assert [linha['nome'] for linha in linhas] == ['2024', 'Sítio']
+    assert [linha['estado'] for linha in linhas] == ['SP', 'MG']
+    assert all(linha['gravada'] for linha in linhas)
+
+    codigo, linhas, _ = cli('list', '--colunas', 'nome')
+    assert codigo == 0 and linhas == [{'nome': '2024'}, {'nome': 'Sítio'}]
+
+
+def test_simular_parquet_pela_entrada_padrao(cli):
+    buffer = io.BytesIO()
+    entradas.to_parquet(buffer)
+
+    codigo, linhas, erros = cli('simulate', '--formato', 'parquet', '-', entrada=buffer.getvalue())
+    assert codigo == 0, erros
+    assert len(linhas) == 2
+
+
+def test_filtrar_com_valor_zero(cli):
+    cli('simular', '-', entrada=entradas.to_json(orient='records', lines=True))
+
+    assert cli('filter', 'tamanho_disp', '<', '0')[:2] == (0, [])
+    codigo, linhas, _ = cli('filtrar', 'tamanho_disp', '>', '0')
+    assert codigo == 0 and len(linhas) == 2
+
+
+def test_codigos_de_saida_da_exportacao(cli, tmp_path):
+    codigo, _, erros = cli('export', str(tmp_path / 'vazio'), '--formatos', 'json')
+    assert codigo == 1 and 'Nenhuma simulação' in erros
+
+    cli('simular', entrada=entradas.to_json(orient='records', lines=True))
+
+    codigo, linhas, erros = cli('export', str(tmp_path / 'nao_existe' / 'saida'), '--formatos', 'parquet', 'json')
+    assert codigo == 1 and linhas == [] and 'Erro' in erros
+
+    codigo, linhas, _ = cli('export', str(tmp_path / 'saida'), '--formatos', 'parquet', 'json')
+    assert codigo == 0 and linhas == []
+    assert (tmp_path / 'saida.parquet').exists() and (tmp_path / 'saida.json').exists()
+
+    codigo, linhas, _ = cli('exportar', '-')
+    assert codigo == 0 and list(linhas[0]) == GS_PY.colunas_resultados
+
+
+def test_senha_errada(cli, monkeypatch):
+    monkeypatch.setenv('GS_PY_SENHA', 'senha-errada')
+    codigo, linhas, erros = cli('list')
+    assert codigo == 2 and linhas == [] and 'inválidos' in erros
@@ -0,0 +1,17 @@
+import pytest
+
+import GS_PY
+
+
+def test_filtro_com_valor_zero_nao_e_ignorado(banco_sqlite):
+    GS_PY.criar_simulacoes_em_lote(banco_sqlite, ['A', 'B'], [10, 20], ['SP', 'RJ'], [100, 200], [50000, 50000])
+
+    assert len(GS_PY.listar_dados(banco_sqlite, 'tamanho_disp', 0, '<', exibir=False)) == 0
+    assert len(GS_PY.listar_dados(banco_sqlite, 'tamanho_disp', 0, '>', exibir=False)) == 2
+    assert len(GS_PY.listar_dados(banco_sqlite, exibir=False)) == 2
+
+
+@pytest.mark.parametrize('coluna, valor, condicao', [(None, 10, '<'), (None, None, '='), ('consumo', None, '<')])
+def test_filtro_incompleto_e_rejeitado(banco_sqlite, coluna, valor, condicao):
+    with pytest.raises(ValueError):
+        GS_PY.listar_dados(banco_sqlite, coluna, valor, condicao, exibir=False)
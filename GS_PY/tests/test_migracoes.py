@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+import GS_PY
+
+
+def economias(caminho):
+    with sqlite3.connect(caminho) as conn:
+        return dict(conn.execute("SELECT nome, economia_anual FROM simulacoes"))
+
+
+def test_correcao_da_economia_so_altera_linhas_anteriores(banco_sqlite, tmp_path):
+    caminho = str(tmp_path / 'gs_py.db')
+    # Banco migrado até a versão 2, com uma simulação gravada pelo cálculo antigo (x5)
+    with sqlite3.connect(caminho) as conn:
+        conn.execute("DELETE FROM versao_esquema WHERE versao = 3")
+        conn.execute(
+            "INSERT INTO simulacoes (nome, tamanho_disp, estado, consumo, orcamento, custo_investimento, economia_anual, data, usuario_id)"
+            " VALUES ('antiga', 10, 'SP', 100, 50000, 10000, 500, '2020-01-01 00:00:00', ?)",
+            (banco_sqlite,)
+        )
+
+    # A primeira conexão do processo aplica a migração pendente antes de qualquer gravação
+    GS_PY.configurar_backend('sqlite', caminho=caminho)
+    GS_PY.criar_simulacao(banco_sqlite, 'nova', 10, 'SP', 100, 50000)
+    nova = economias(caminho)['nova']
+    assert economias(caminho)['antiga'] == pytest.approx(100)
+
+    # A data de corte registrada em versao_esquema protege as linhas gravadas depois da migração
+    with sqlite3.connect(caminho) as conn:
+        conn.execute("UPDATE versao_esquema SET aplicada_em = '2021-01-01 00:00:00' WHERE versao = 3")
+        conn.executescript(GS_PY.migracoes[2][2]['sqlite'][0] + ";")
+    assert economias(caminho)['nova'] == pytest.approx(nova)
+
+
+def test_migracao_com_erro_nao_fica_registrada(banco_sqlite, monkeypatch):
+    monkeypatch.setattr(GS_PY, 'migracoes', GS_PY.migracoes + [(99, "Migração com erro", {'sqlite': ["SELECT * FROM tabela_inexistente"]})])
+
+    with pytest.raises(sqlite3.OperationalError):
+        GS_PY.migrar_esquema()
+    with GS_PY.obter_conexao() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM versao_esquema WHERE versao = 99").fetchone()[0] == 0
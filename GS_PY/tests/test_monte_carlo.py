@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+import GS_PY
+
+
+sem_incerteza = {'irradiancia_desvio': 0.0, 'inflacao_desvio': 0.0, 'degradacao_min': 0.005, 'degradacao_max': 0.005}
+
+
+def test_carteira_vazia_retorna_tabela_vazia():
+    resultado = GS_PY.simular_monte_carlo([], [], [], cenarios=10)
+
+    assert len(resultado) == 0
+    assert list(resultado.columns) == ['payback_p10', 'payback_p50', 'payback_p90', 'prob_payback_horizonte']
+
+
+def test_sem_incerteza_concorda_com_a_projecao():
+    tamanho, consumo, estado = [20, 30, 40], [300, 400, 800], ['SP', 'RJ', 'AM']
+    resultado = GS_PY.simular_monte_carlo(tamanho, consumo, estado, cenarios=50, processos=1, premissas=sem_incerteza)
+    projecao = GS_PY.projetar_fluxo_caixa(tamanho, consumo, estado)['resumo']
+
+    assert resultado['payback_p50'].to_numpy() == pytest.approx(projecao['payback_anos'].to_numpy(), rel=1e-5)
+    assert (resultado['payback_p10'] == resultado['payback_p90']).all()
+
+
+def test_geracao_acima_do_consumo_nao_ganha_com_irradiancia():
+    # Sistema grande para um consumo pequeno: sol acima da média não aumenta a economia
+    resultado = GS_PY.simular_monte_carlo([500], [100], ['SP'], cenarios=2_000, processos=1,
+                                          premissas={'inflacao_desvio': 0.0, 'degradacao_min': 0.005, 'degradacao_max': 0.005})
+    projecao = GS_PY.projetar_fluxo_caixa([500], [100], ['SP'])['resumo']
+
+    assert np.isclose(resultado['payback_p10'][0], projecao['payback_anos'][0], rtol=1e-5)
@@ -0,0 +1,53 @@
+import asyncio
+import sqlite3
+
+import GS_PY
+
+
+def senha_gravada(usuario_id):
+    with GS_PY.obter_conexao() as conn:
+        return conn.execute("SELECT senha FROM usuarios WHERE usuario_id = ?", (usuario_id,)).fetchone()[0]
+
+
+def gravar_senha(usuario_id, senha):
+    with GS_PY.obter_conexao() as conn:
+        conn.execute("UPDATE usuarios SET senha = ? WHERE usuario_id = ?", (senha, usuario_id))
+        conn.commit()
+
+
+def test_hash_confere_a_senha():
+    gravada = GS_PY.gerar_hash_senha('segredo', custo=10)
+
+    assert gravada.startswith('scrypt$10$') and 'segredo' not in gravada
+    assert GS_PY.gerar_hash_senha('segredo', custo=10) != gravada  # salt aleatório
+    assert GS_PY.verificar_senha('segredo', gravada) == (True, True)  # custo diferente do padrão
+    assert GS_PY.verificar_senha('outra', gravada)[0] is False
+
+
+def test_login_com_senha_errada(banco_sqlite):
+    assert GS_PY.autenticar('teste@exemplo.com', 'senha-teste') == banco_sqlite
+    assert GS_PY.autenticar('teste@exemplo.com', 'senha-errada') is None
+    assert GS_PY.autenticar('ninguem@exemplo.com', 'senha-teste') is None
+
+
+def test_senha_em_texto_e_regravada_com_hash(banco_sqlite):
+    gravar_senha(banco_sqlite, 'antiga')
+
+    assert GS_PY.autenticar('teste@exemplo.com', 'errada') is None
+    assert senha_gravada(banco_sqlite) == 'antiga'
+
+    assert GS_PY.autenticar('teste@exemplo.com', 'antiga') == banco_sqlite
+    nova = senha_gravada(banco_sqlite)
+    assert nova.startswith('scrypt$') and GS_PY.verificar_senha('antiga', nova) == (True, False)
+
+
+def test_falha_ao_regravar_o_hash_nao_impede_o_login(banco_sqlite, monkeypatch):
+    gravar_senha(banco_sqlite, 'antiga')
+
+    def falhar(senha, custo=None):
+        raise sqlite3.DataError("valor maior que a coluna")
+
+    monkeypatch.setattr(GS_PY, 'gerar_hash_senha', falhar)
+    assert GS_PY.autenticar('teste@exemplo.com', 'antiga') == banco_sqlite
+    assert asyncio.run(GS_PY.autenticar_async('teste@exemplo.com', 'antiga')) == banco_sqlite
+    assert senha_gravada(banco_sqlite) == 'antiga'